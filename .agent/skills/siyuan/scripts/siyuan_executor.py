@@ -1,27 +1,162 @@
 import os
+import re
 import sys
 import json
+import time
+import random
+import bisect
+import asyncio
+import hashlib
+import itertools
 import requests
 import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# Connect / read timeouts in seconds
+DEFAULT_TIMEOUT = (5, 60)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_CONCURRENCY = 4
+# Worth another try: rate limited or the kernel is busy/restarting
+RETRY_STATUS = {429, 500, 502, 503, 504}
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_CACHE_SIZE = 128
+DEFAULT_CACHE_TTL = 30
+# Endpoints that never change content; any other call invalidates the query cache
+READ_PATHS = {"/query/sql", "/notebook/lsNotebooks", "/block/getBlockKramdown"}
+READ_STATEMENT = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+class SiYuanError(Exception):
+    pass
+
+def _not_sent(error):
+    """True when a request failed before reaching the kernel (a write can be resent)."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+class QueryCache:
+    """Small LRU of read query results that expire after `ttl` seconds."""
+
+    def __init__(self, size=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sql):
+        with self.lock:
+            entry = self.entries.get(sql)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self.entries.move_to_end(sql)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self.entries[sql]
+            self.misses += 1
+            return None
+
+    def put(self, sql, result):
+        if self.size <= 0:
+            return
+        with self.lock:
+            self.entries[sql] = (time.monotonic(), result)
+            self.entries.move_to_end(sql)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+def _quote(value):
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _page_sql(sql, page_size, key=None, after=None, offset=0):
+    """One page of `sql`: rows with `key` past `after`, or at `offset`."""
+    sql = sql.strip().rstrip(";")
+    if key:
+        where = f" WHERE {key} > {_quote(after)}" if after is not None else ""
+        return f"SELECT * FROM ({sql}){where} ORDER BY {key} LIMIT {page_size}"
+    return f"SELECT * FROM ({sql}) LIMIT {page_size} OFFSET {offset}"
 
 class SiYuanClient:
-    def __init__(self, host="127.0.0.1", port="6806", token=None):
+    """Kernel API client on one keep-alive session, with timeouts and retries.
+
+    Reads are retried on connection errors, timeouts and 429/5xx responses
+    with exponential backoff (and jitter). Writes may already have been
+    applied after a read timeout or 5xx, so they are only retried when the
+    connection could not be made. API errors (code != 0) are never retried.
+    Read queries are cached briefly; any write through the client clears
+    the cache.
+    """
+
+    def __init__(self, host="127.0.0.1", port="6806", token=None, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, pool_size=DEFAULT_CONCURRENCY,
+                 cache_size=DEFAULT_CACHE_SIZE, cache_ttl=DEFAULT_CACHE_TTL):
         self.base_url = f"http://{host}:{port}/api"
         self.headers = {
             "Authorization": f"Token {token}" if token else ""
         }
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.cache = QueryCache(cache_size, cache_ttl)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
 
     def _post(self, path, data=None):
         url = f"{self.base_url}{path}"
-        try:
-            response = requests.post(url, json=data or {}, headers=self.headers)
-            response.raise_for_status()
-            res_json = response.json()
-            if res_json.get("code") != 0:
-                return {"status": "error", "message": res_json.get("msg", "Unknown error"), "code": res_json.get("code")}
-            return {"status": "success", "data": res_json.get("data")}
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
+        read = path in READ_PATHS
+        if not read:
+            # Cleared even if the write fails: it may have been applied
+            self.cache.clear()
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                response = self.session.post(url, json=data or {}, timeout=self.timeout)
+                if response.status_code in RETRY_STATUS and read and not last:
+                    time.sleep(self._delay(attempt, response))
+                    continue
+                response.raise_for_status()
+                res_json = response.json()
+                if res_json.get("code") != 0:
+                    return {"status": "error", "message": res_json.get("msg", "Unknown error"), "code": res_json.get("code")}
+                return {"status": "success", "data": res_json.get("data")}
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last or not (read or _not_sent(e)):
+                    return {"status": "error", "message": str(e)}
+                time.sleep(self._delay(attempt))
+            except Exception as e:
+                return {"status": "error", "message": str(e)}
 
     def list_notebooks(self):
         return self._post("/notebook/lsNotebooks")
@@ -33,8 +168,38 @@ class SiYuanClient:
             "markdown": markdown
         })
 
-    def sql_query(self, sql):
-        return self._post("/query/sql", {"stmt": sql})
+    def sql_query(self, sql, cache=True):
+        cacheable = cache and READ_STATEMENT.match(sql)
+        if cacheable:
+            result = self.cache.get(sql)
+            if result is not None:
+                return result
+        result = self._post("/query/sql", {"stmt": sql})
+        if cacheable and result["status"] == "success":
+            self.cache.put(sql, result)
+        return result
+
+    def iter_sql(self, sql, page_size=DEFAULT_PAGE_SIZE, key=None):
+        """Yield the rows of a read query lazily, one page at a time.
+
+        Pages use keyset pagination on column `key` (a unique column such as
+        `id`; rows come in key order), or else LIMIT/OFFSET. SQLite does not
+        promise a stable row order without ORDER BY, so OFFSET pages may
+        skip or repeat rows unless the query orders by a unique column:
+        pass `key` when completeness matters. Pages bypass the query cache.
+        The kernel caps unbounded queries, so this also returns all rows
+        of a query without its own LIMIT.
+        """
+        after = None
+        for offset in itertools.count(0, page_size):
+            result = self.sql_query(_page_sql(sql, page_size, key, after, offset), cache=False)
+            if result["status"] != "success":
+                raise SiYuanError(result["message"])
+            rows = result["data"] or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            after = rows[-1].get(key) if key else None
 
     def get_block_kramdown(self, id):
         return self._post("/block/getBlockKramdown", {"id": id})
@@ -49,17 +214,417 @@ class SiYuanClient:
             payload["previousID"] = previousID
         return self._post("/block/insertBlock", payload)
 
+    def append_block(self, data, dataType, parentID):
+        return self._post("/block/appendBlock", {
+            "data": data,
+            "dataType": dataType,
+            "parentID": parentID
+        })
+
+    def prepend_block(self, data, dataType, parentID):
+        return self._post("/block/prependBlock", {
+            "data": data,
+            "dataType": dataType,
+            "parentID": parentID
+        })
+
+    def update_block(self, id, data, dataType="markdown"):
+        return self._post("/block/updateBlock", {
+            "id": id,
+            "data": data,
+            "dataType": dataType
+        })
+
+    def delete_block(self, id):
+        return self._post("/block/deleteBlock", {"id": id})
+
+    def move_block(self, id, previousID=None, parentID=None):
+        payload = {"id": id}
+        if previousID:
+            payload["previousID"] = previousID
+        else:
+            payload["parentID"] = parentID
+        return self._post("/block/moveBlock", payload)
+
+class AsyncSiYuanClient:
+    """asyncio front for SiYuanClient: at most `concurrency` requests in flight.
+
+    Calls run on a thread pool sized to the connection pool, so every
+    in-flight request has a kept-alive connection of its own.
+    """
+
+    def __init__(self, host="127.0.0.1", port="6806", token=None, concurrency=DEFAULT_CONCURRENCY, **kwargs):
+        self.client = SiYuanClient(host, port, token, pool_size=concurrency, **kwargs)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def _call(self, method, *args):
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, method, *args)
+
+    def close(self):
+        self.executor.shutdown()
+        self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    async def list_notebooks(self):
+        return await self._call(self.client.list_notebooks)
+
+    async def create_doc(self, notebook, path, markdown):
+        return await self._call(self.client.create_doc, notebook, path, markdown)
+
+    async def sql_query(self, sql, cache=True):
+        return await self._call(self.client.sql_query, sql, cache)
+
+    async def iter_sql(self, sql, page_size=DEFAULT_PAGE_SIZE, key=None):
+        after = None
+        for offset in itertools.count(0, page_size):
+            result = await self.sql_query(_page_sql(sql, page_size, key, after, offset), cache=False)
+            if result["status"] != "success":
+                raise SiYuanError(result["message"])
+            rows = result["data"] or []
+            for row in rows:
+                yield row
+            if len(rows) < page_size:
+                return
+            after = rows[-1].get(key) if key else None
+
+    async def get_block_kramdown(self, id):
+        return await self._call(self.client.get_block_kramdown, id)
+
+    async def insert_block(self, data, dataType, parentID, previousID=None):
+        return await self._call(self.client.insert_block, data, dataType, parentID, previousID)
+
+    async def append_block(self, data, dataType, parentID):
+        return await self._call(self.client.append_block, data, dataType, parentID)
+
+    async def prepend_block(self, data, dataType, parentID):
+        return await self._call(self.client.prepend_block, data, dataType, parentID)
+
+    async def update_block(self, id, data, dataType="markdown"):
+        return await self._call(self.client.update_block, id, data, dataType)
+
+    async def delete_block(self, id):
+        return await self._call(self.client.delete_block, id)
+
+    async def move_block(self, id, previousID=None, parentID=None):
+        return await self._call(self.client.move_block, id, previousID, parentID)
+
+def load_manifest(path):
+    """Docs to publish, from a JSON array or JSON lines.
+
+    Each entry is a doc ({"notebook", "path", "markdown" or "markdown_file"})
+    and/or blocks to append ({"blocks": [{"data" or "data_file", "dataType"}]})
+    under the new doc or an existing "parentID". Files are relative to the
+    manifest.
+    """
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if text.lstrip().startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    def content(item, key):
+        if f"{key}_file" in item:
+            return (path.parent / item[f"{key}_file"]).read_text(encoding="utf-8")
+        return item.get(key, "")
+
+    for entry in entries:
+        if "path" in entry:
+            entry["markdown"] = content(entry, "markdown")
+        for block in entry.get("blocks", []):
+            block["data"] = content(block, "data")
+    return entries
+
+async def publish(client, entry):
+    """Create one doc, then append its blocks in order."""
+    result = {"path": entry.get("path"), "blocks": 0}
+    parent = entry.get("parentID")
+    if "path" in entry:
+        res = await client.create_doc(entry["notebook"], entry["path"], entry["markdown"])
+        if res["status"] != "success":
+            return {**result, "status": "error", "message": res["message"]}
+        parent = result["id"] = res["data"]
+    for block in entry.get("blocks", []):
+        res = await client.append_block(block["data"], block.get("dataType", "markdown"), parent)
+        if res["status"] != "success":
+            return {**result, "status": "error", "message": res["message"]}
+        result["blocks"] += 1
+    return {**result, "status": "success"}
+
+async def run_batch(client, entries):
+    """Publish all manifest entries concurrently (bounded by the client)."""
+    start = time.perf_counter()
+    results = await asyncio.gather(*(publish(client, entry) for entry in entries))
+    failed = [r for r in results if r["status"] != "success"]
+    return {
+        "status": "error" if failed else "success",
+        "data": {
+            "docs": sum(1 for r in results if "id" in r),
+            "blocks": sum(r["blocks"] for r in results),
+            "failed": failed,
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+    }
+
+async def batch(host, port, token, manifest, concurrency, **kwargs):
+    async with AsyncSiYuanClient(host, port, token, concurrency, **kwargs) as client:
+        return await run_batch(client, load_manifest(manifest))
+
+HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+LIST_ITEM = re.compile(r"^(\d+\.|[-*+])\s+(.*)$")
+LINK = re.compile(r"\]\(([^)\s]+)\)")
+# Xiaohongshu note links; their query string (xsec_token) changes per session
+NOTE_ID = re.compile(r"/(?:explore|search_result|discovery/item)/([0-9a-zA-Z]+)")
+
+def _link_key(link):
+    match = NOTE_ID.search(link)
+    return match.group(1) if match else link.split("?", 1)[0]
+
+def split_markdown(markdown):
+    """Split a report into (key, markdown) blocks in document order.
+
+    Headings, fenced code, paragraphs and top-level list items (with their
+    indented sub-lines) each become one block. Keys stay stable across
+    refreshes: the heading path plus, for a list item, the note ID or
+    query-less URL of its first link (else its text without the list
+    marker), so a re-ranked note keeps its key. Ordered items are sent as
+    bullets: a rank number in the block would change whenever a note
+    above it moves.
+    """
+    blocks = []
+    path = []
+    lines = markdown.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if not line.strip():
+            i += 1
+            continue
+        start = i
+        heading = HEADING.match(line)
+        item = LIST_ITEM.match(line)
+        if heading:
+            level = len(heading.group(1))
+            path = path[:level - 1] + [""] * (level - 1 - len(path)) + [heading.group(2).strip()]
+            ident = "#"
+            i += 1
+        elif line.startswith("```"):
+            i += 1
+            while i < len(lines) and not lines[i].startswith("```"):
+                i += 1
+            i += 1
+            ident = "code"
+        elif item:
+            link = LINK.search(line)
+            ident = "item:" + (_link_key(link.group(1)) if link else item.group(2).strip())
+            if item.group(1)[0].isdigit():
+                lines[i] = "- " + item.group(2)
+            i += 1
+            while i < len(lines) and lines[i][:1] in (" ", "\t") and lines[i].strip():
+                i += 1
+        else:
+            i += 1
+            while (i < len(lines) and lines[i].strip() and not HEADING.match(lines[i])
+                   and not LIST_ITEM.match(lines[i]) and not lines[i].startswith("```")):
+                i += 1
+            ident = "p"
+        blocks.append(("/".join(path) + "|" + ident, "\n".join(lines[start:i]).rstrip()))
+
+    # Repeated keys (two paragraphs in one section) get an ordinal
+    seen = {}
+    unique = []
+    for key, text in blocks:
+        seen[key] = seen.get(key, 0) + 1
+        unique.append((key if seen[key] == 1 else f"{key}#{seen[key]}", text))
+    return unique
+
+def block_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+def plan_sync(old, new):
+    """Operations turning the synced blocks `old` into `new`.
+
+    `old` is the manifest's [key, hash, id] list in document order, `new`
+    the split report. Kept blocks whose order survived (the longest
+    increasing run of their old positions) stay put; the others are moved.
+    New and moved blocks are grouped into runs, each anchored after a
+    block that stays put (None: the start of the doc).
+    """
+    position = {key: (pos, digest, id) for pos, (key, digest, id) in enumerate(old)}
+    keys = {key for key, _ in new}
+    deletes = [id for key, _, id in old if key not in keys]
+    updates = []
+    kept = []
+    for index, (key, text) in enumerate(new):
+        if key in position:
+            pos, digest, id = position[key]
+            kept.append((index, pos))
+            if digest != block_hash(text):
+                updates.append((index, id))
+
+    # Longest increasing subsequence of old positions (patience sorting)
+    tails, tail_index, parent = [], [], {}
+    for index, pos in kept:
+        slot = bisect.bisect_left(tails, pos)
+        parent[index] = tail_index[slot - 1] if slot else None
+        if slot == len(tails):
+            tails.append(pos)
+            tail_index.append(index)
+        else:
+            tails[slot] = pos
+            tail_index[slot] = index
+    stable = set()
+    index = tail_index[-1] if tail_index else None
+    while index is not None:
+        stable.add(index)
+        index = parent[index]
+
+    runs = []
+    anchor = None
+    run = None
+    for index, (key, _) in enumerate(new):
+        if index in stable:
+            anchor = position[key][2]
+            run = None
+            continue
+        if run is None:
+            run = (anchor, [])
+            runs.append(run)
+        run[1].append((index, position[key][2] if key in position else None))
+    return {"deletes": deletes, "updates": updates, "runs": runs}
+
+def _new_block_id(res):
+    # insertBlock/prependBlock answer with the transaction that created the block
+    return res["data"][0]["doOperations"][0]["id"]
+
+async def sync_report(client, report, notebook, path, state_path=None, dry_run=False):
+    """Sync a markdown report into one doc, sending only changed blocks.
+
+    The state file maps each block key to its content hash and block ID;
+    without one (or for another notebook/path) the doc is created afresh.
+    """
+    report = Path(report)
+    state_path = Path(state_path) if state_path else report.with_suffix(".siyuan.json")
+    state = json.loads(state_path.read_text(encoding="utf-8")) if state_path.exists() else {}
+    if state.get("notebook") != notebook or state.get("path") != path:
+        state = {}
+    new = split_markdown(report.read_text(encoding="utf-8"))
+    plan = plan_sync(state.get("blocks", []), new)
+    placed = {index: id for _, run in plan["runs"] for index, id in run}
+    touched = placed.keys() | {index for index, _ in plan["updates"]}
+    summary = {
+        "inserted": sum(1 for id in placed.values() if not id),
+        "moved": sum(1 for id in placed.values() if id),
+        "updated": len(plan["updates"]),
+        "deleted": len(plan["deletes"]),
+        "unchanged": len(new) - len(touched),
+        "failed": []
+    }
+    if dry_run:
+        return {"status": "success", "data": {"doc_id": state.get("doc_id"), **summary}}
+
+    start = time.perf_counter()
+    doc_id = state.get("doc_id")
+    if not doc_id:
+        res = await client.create_doc(notebook, path, "")
+        if res["status"] != "success":
+            return res
+        doc_id = res["data"]
+
+    old = {key: (digest, id) for key, digest, id in state.get("blocks", [])}
+    ids = {index: old[key][1] for index, (key, _) in enumerate(new) if key in old}
+    hashes = {index: old[key][0] for index, (key, _) in enumerate(new) if key in old}
+    failed = summary["failed"]
+
+    def check(res, op, key):
+        if res["status"] != "success":
+            failed.append({"op": op, "key": key, "message": res["message"]})
+            return False
+        return True
+
+    async def delete(id):
+        res = await client.delete_block(id)
+        return id if check(res, "delete", id) else None
+
+    async def update(index, id):
+        key, text = new[index]
+        if check(await client.update_block(id, text), "update", key):
+            hashes[index] = block_hash(text)
+
+    async def place(anchor, run):
+        previous = anchor
+        for index, id in run:
+            key, text = new[index]
+            if id:
+                if not check(await client.move_block(id, previous, doc_id), "move", key):
+                    continue
+            else:
+                if previous:
+                    res = await client.insert_block(text, "markdown", doc_id, previous)
+                else:
+                    res = await client.prepend_block(text, "markdown", doc_id)
+                if not check(res, "insert", key):
+                    continue
+                try:
+                    id = _new_block_id(res)
+                except (KeyError, IndexError, TypeError):
+                    failed.append({"op": "insert", "key": key, "message": f"No block ID in response: {res['data']!r}"})
+                    continue
+                ids[index] = id
+                hashes[index] = block_hash(text)
+            previous = id
+
+    deleted = set()
+    try:
+        deleted.update(await asyncio.gather(*(delete(id) for id in plan["deletes"])))
+        await asyncio.gather(*(update(index, id) for index, id in plan["updates"]),
+                             *(place(anchor, run) for anchor, run in plan["runs"]))
+    finally:
+        # Always record what was done, or the next sync would insert it again.
+        # Failed inserts are retried next time; failed deletes stay listed
+        blocks = [[key, hashes[index], ids[index]] for index, (key, _) in enumerate(new) if index in ids]
+        blocks += [[key, digest, id] for key, digest, id in state.get("blocks", [])
+                   if id in plan["deletes"] and id not in deleted]
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        state_path.write_text(json.dumps({"notebook": notebook, "path": path, "doc_id": doc_id, "blocks": blocks},
+                                         ensure_ascii=False), encoding="utf-8")
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    return {"status": "error" if failed else "success", "data": {"doc_id": doc_id, **summary}}
+
+async def sync(host, port, token, report, notebook, path, state_path, concurrency, dry_run=False, **kwargs):
+    async with AsyncSiYuanClient(host, port, token, concurrency, **kwargs) as client:
+        return await sync_report(client, report, notebook, path, state_path, dry_run)
+
 def main():
     parser = argparse.ArgumentParser(description="SiYuan Note API Executor")
-    parser.add_argument("command", help="Command to execute (list_notebooks, create_doc, sql, etc.)")
+    parser.add_argument("command", help="Command to execute (list_notebooks, create_doc, sql, batch, sync, etc.)")
     parser.add_argument("--notebook", help="Notebook ID")
     parser.add_argument("--path", help="Document path")
     parser.add_argument("--markdown", help="Markdown content")
     parser.add_argument("--sql", help="SQL statement")
+    parser.add_argument("--jsonl", action="store_true", help="Stream all result rows as JSON lines, page by page (sql)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Rows per page (sql --jsonl)")
+    parser.add_argument("--key", help="Page on this unique column (keyset) instead of LIMIT/OFFSET; needed for complete, "
+                             "duplicate-free pages unless the query orders by a unique column (sql --jsonl)")
     parser.add_argument("--id", help="Block/Doc ID")
     parser.add_argument("--data", help="Block data")
     parser.add_argument("--parent", help="Parent ID")
-    
+    parser.add_argument("--manifest", help="Docs/blocks to publish (batch), JSON array or JSON lines")
+    parser.add_argument("--report", help="Markdown report to sync into the doc at --notebook/--path (sync)")
+    parser.add_argument("--state", help="Sync state file (default: next to the report, .siyuan.json)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the changes a sync would send")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Requests in flight (batch)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT[1], help="Read timeout in seconds")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Retries for reads on connection errors, timeouts and 429/5xx; for writes only when the connection fails")
+
     args = parser.parse_args()
 
     # Load config from env or fallback
@@ -71,12 +636,30 @@ def main():
         print(json.dumps({"status": "error", "message": "SIYUAN_TOKEN environment variable is not set."}))
         sys.exit(1)
 
-    client = SiYuanClient(host, port, token)
+    options = {"timeout": (DEFAULT_TIMEOUT[0], args.timeout), "retries": args.retries}
+    if args.command in ("batch", "sync"):
+        if args.command == "batch":
+            run = batch(host, port, token, args.manifest, max(1, args.concurrency), **options)
+        else:
+            run = sync(host, port, token, args.report, args.notebook, args.path, args.state,
+                       max(1, args.concurrency), args.dry_run, **options)
+        print(json.dumps(asyncio.run(run), indent=2, ensure_ascii=False))
+        return
+
+    client = SiYuanClient(host, port, token, **options)
 
     if args.command == "list_notebooks":
         result = client.list_notebooks()
     elif args.command == "create_doc":
         result = client.create_doc(args.notebook, args.path, args.markdown)
+    elif args.command == "sql" and args.jsonl:
+        try:
+            for row in client.iter_sql(args.sql, args.page_size, args.key):
+                print(json.dumps(row, ensure_ascii=False))
+        except SiYuanError as e:
+            print(json.dumps({"status": "error", "message": str(e)}, ensure_ascii=False))
+            sys.exit(1)
+        return
     elif args.command == "sql":
         result = client.sql_query(args.sql)
     elif args.command == "get_block":
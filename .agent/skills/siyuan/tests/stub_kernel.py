@@ -0,0 +1,144 @@
+"""
+In-memory stand-in for the SiYuan kernel API, for tests.
+
+Serves the endpoints siyuan_executor.py uses on a local port. Docs are
+lists of [block_id, markdown]; /query/sql runs against an SQLite `blocks`
+table that tests can fill. Faults can be queued per endpoint: an int is
+answered as that HTTP status, a float delays the (still applied) request
+by that many seconds and a dict is sent as the response body instead.
+"""
+
+import json
+import sqlite3
+import threading
+import itertools
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class StubKernel:
+    def __init__(self):
+        self.calls = []
+        self.faults = {}
+        self.docs = {}
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("CREATE TABLE blocks (id TEXT PRIMARY KEY, content TEXT)")
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._server = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        kernel = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Buffered, so headers and body go out in one segment (no delayed-ACK stalls)
+            wbufsize = -1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])) or b"{}")
+                status, payload = kernel.handle(self.path[len("/api"):], body)
+                out = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def fail(self, path, *faults):
+        self.faults.setdefault(path, []).extend(faults)
+
+    def count(self, path):
+        return sum(1 for p, _ in self.calls if p == path)
+
+    def doc(self, doc_id):
+        return [markdown for _, markdown in self.docs[doc_id]]
+
+    def _new_id(self):
+        return f"20260101000000-{next(self._ids):07d}"
+
+    def _find(self, block_id):
+        for blocks in self.docs.values():
+            for i, (bid, _) in enumerate(blocks):
+                if bid == block_id:
+                    return blocks, i
+        raise KeyError(block_id)
+
+    def handle(self, path, body):
+        with self.lock:
+            self.calls.append((path, body))
+            queue = self.faults.get(path)
+            fault = queue.pop(0) if queue else None
+        if isinstance(fault, int):
+            return fault, {"code": -1, "msg": f"stub fault {fault}"}
+        if isinstance(fault, dict):
+            return 200, fault
+        if isinstance(fault, float):
+            threading.Event().wait(fault)
+        with self.lock:
+            try:
+                return 200, {"code": 0, "msg": "", "data": self._apply(path, body)}
+            except KeyError as e:
+                return 200, {"code": -1, "msg": f"not found: {e}", "data": None}
+
+    def _apply(self, path, body):
+        if path == "/notebook/lsNotebooks":
+            return {"notebooks": [{"id": "nb", "name": "stub"}]}
+        if path == "/query/sql":
+            return [dict(row) for row in self.db.execute(body["stmt"])]
+        if path == "/filetree/createDocWithMd":
+            doc_id = self._new_id()
+            self.docs[doc_id] = [[self._new_id(), body["markdown"]]] if body["markdown"] else []
+            return doc_id
+        if path == "/block/getBlockKramdown":
+            blocks, i = self._find(body["id"])
+            return {"id": body["id"], "kramdown": blocks[i][1]}
+        if path in ("/block/insertBlock", "/block/prependBlock", "/block/appendBlock"):
+            block = [self._new_id(), body["data"]]
+            if body.get("previousID"):
+                blocks, i = self._find(body["previousID"])
+                blocks.insert(i + 1, block)
+            elif path == "/block/appendBlock":
+                self.docs[body["parentID"]].append(block)
+            else:
+                self.docs[body["parentID"]].insert(0, block)
+            return [{"doOperations": [{"action": "insert", "id": block[0]}], "undoOperations": None}]
+        if path == "/block/updateBlock":
+            blocks, i = self._find(body["id"])
+            blocks[i][1] = body["data"]
+            return [{"doOperations": [{"action": "update", "id": body["id"]}]}]
+        if path == "/block/deleteBlock":
+            blocks, i = self._find(body["id"])
+            del blocks[i]
+            return [{"doOperations": [{"action": "delete", "id": body["id"]}]}]
+        if path == "/block/moveBlock":
+            blocks, i = self._find(body["id"])
+            block = blocks.pop(i)
+            if body.get("previousID"):
+                blocks, i = self._find(body["previousID"])
+                blocks.insert(i + 1, block)
+            else:
+                self.docs[body["parentID"]].insert(0, block)
+            return [{"doOperations": [{"action": "move", "id": body["id"]}]}]
+        raise KeyError(path)
@@ -0,0 +1,189 @@
+import sys
+import json
+import time
+import socket
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import siyuan_executor as se
+from stub_kernel import StubKernel
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class RetryTest(unittest.TestCase):
+    def setUp(self):
+        self.kernel = StubKernel().start()
+        self.client = se.SiYuanClient("127.0.0.1", self.kernel.port, "t", backoff=0.1)
+
+    def tearDown(self):
+        self.client.close()
+        self.kernel.stop()
+
+    def test_read_retried_on_5xx_with_backoff(self):
+        self.kernel.fail("/notebook/lsNotebooks", 503, 502)
+        with mock.patch.object(se.time, "sleep") as sleep:
+            result = self.client.list_notebooks()
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(self.kernel.count("/notebook/lsNotebooks"), 3)
+        first, second = (call.args[0] for call in sleep.call_args_list)
+        self.assertTrue(0.05 <= first <= 0.15)
+        self.assertTrue(0.1 <= second <= 0.3)
+
+    def test_read_gives_up_after_retries(self):
+        self.kernel.fail("/notebook/lsNotebooks", 503, 503, 503, 503)
+        with mock.patch.object(se.time, "sleep"):
+            result = self.client.list_notebooks()
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(self.kernel.count("/notebook/lsNotebooks"), 4)
+
+    def test_write_not_retried_on_5xx(self):
+        self.kernel.fail("/filetree/createDocWithMd", 503)
+        with mock.patch.object(se.time, "sleep") as sleep:
+            result = self.client.create_doc("nb", "/a", "# a")
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(self.kernel.count("/filetree/createDocWithMd"), 1)
+        sleep.assert_not_called()
+
+    def test_write_not_resent_after_read_timeout(self):
+        self.kernel.fail("/filetree/createDocWithMd", 0.5)
+        client = se.SiYuanClient("127.0.0.1", self.kernel.port, "t", timeout=(2, 0.2), backoff=0.01)
+        result = client.create_doc("nb", "/a", "# a")
+        time.sleep(0.5)
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(self.kernel.count("/filetree/createDocWithMd"), 1)
+        self.assertEqual(len(self.kernel.docs), 1)
+
+    def test_write_retried_when_connection_refused(self):
+        client = se.SiYuanClient("127.0.0.1", free_port(), "t", retries=2)
+        with mock.patch.object(se.time, "sleep") as sleep:
+            result = client.create_doc("nb", "/a", "# a")
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(sleep.call_count, 2)
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.kernel = StubKernel().start()
+        self.dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        self.kernel.stop()
+
+    def run_batch(self, entries):
+        manifest = self.dir / "manifest.jsonl"
+        manifest.write_text("\n".join(json.dumps(e, ensure_ascii=False) for e in entries), encoding="utf-8")
+        return asyncio.run(se.batch("127.0.0.1", self.kernel.port, "t", manifest, 4, backoff=0.01))
+
+    def test_batch_publishes_docs_and_blocks_in_order(self):
+        (self.dir / "report.md").write_text("# 黄山", encoding="utf-8")
+        entries = [{"notebook": "nb", "path": f"/d{i}", "markdown": f"# d{i}",
+                    "blocks": [{"data": f"b{i}-{j}"} for j in range(3)]} for i in range(10)]
+        entries[0] = {"notebook": "nb", "path": "/file", "markdown_file": "report.md", "blocks": [{"data": "x"}]}
+        result = self.run_batch(entries)
+        self.assertEqual(result["status"], "success")
+        self.assertEqual((result["data"]["docs"], result["data"]["blocks"]), (10, 28))
+        docs = sorted(self.kernel.docs.values(), key=lambda blocks: blocks[0][1])
+        self.assertEqual([m for _, m in docs[0]], ["# d1", "b1-0", "b1-1", "b1-2"])
+        self.assertIn(["# 黄山", "x"], [[m for _, m in blocks] for blocks in docs])
+
+    def test_batch_reports_failed_docs(self):
+        self.kernel.fail("/filetree/createDocWithMd", 500)
+        result = self.run_batch([{"notebook": "nb", "path": f"/d{i}", "markdown": "m"} for i in range(5)])
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["data"]["docs"], 4)
+        self.assertEqual(len(result["data"]["failed"]), 1)
+        self.assertEqual(self.kernel.count("/filetree/createDocWithMd"), 5)
+
+
+class IterSqlTest(unittest.TestCase):
+    def setUp(self):
+        self.kernel = StubKernel().start()
+        self.kernel.db.executemany("INSERT INTO blocks VALUES (?, ?)", [(f"{i:06d}", f"c{i}") for i in range(1200)])
+        self.client = se.SiYuanClient("127.0.0.1", self.kernel.port, "t")
+
+    def tearDown(self):
+        self.client.close()
+        self.kernel.stop()
+
+    def test_keyset_pages_are_complete_and_not_cached(self):
+        rows = list(self.client.iter_sql("SELECT * FROM blocks;", 500, key="id"))
+        self.assertEqual([r["id"] for r in rows], [f"{i:06d}" for i in range(1200)])
+        self.assertEqual(self.kernel.count("/query/sql"), 3)
+        self.assertEqual(len(self.client.cache.entries), 0)
+
+    def test_read_cache_cleared_by_writes(self):
+        self.client.sql_query("SELECT COUNT(*) AS n FROM blocks")
+        self.client.sql_query("SELECT COUNT(*) AS n FROM blocks")
+        self.assertEqual(self.kernel.count("/query/sql"), 1)
+        self.client.delete_block("missing")
+        self.client.sql_query("SELECT COUNT(*) AS n FROM blocks")
+        self.assertEqual(self.kernel.count("/query/sql"), 2)
+
+
+def report(links, token="a"):
+    lines = ["# 黄山旅行攻略\n", "## 详细内容\n", "### 📋 攻略\n"]
+    for i, link in enumerate(links, 1):
+        lines.append(f"{i}. [note {link}](https://www.xiaohongshu.com/explore/{link}?xsec_token={token})")
+        lines.append(f"   - 作者: a | 点赞: {link}")
+    return "\n".join(lines)
+
+
+class SyncTest(unittest.TestCase):
+    def setUp(self):
+        self.kernel = StubKernel().start()
+        self.report = Path(tempfile.mkdtemp()) / "黄山_攻略.md"
+
+    def tearDown(self):
+        self.kernel.stop()
+
+    def sync(self, markdown):
+        self.report.write_text(markdown, encoding="utf-8")
+        calls = len(self.kernel.calls)
+        result = asyncio.run(se.sync("127.0.0.1", self.kernel.port, "t", self.report, "nb", "/黄山", None, 4))
+        ops = [path.rsplit("/", 1)[1] for path, _ in self.kernel.calls[calls:]]
+        return result, {op: ops.count(op) for op in set(ops)}
+
+    def assert_synced(self, result, markdown):
+        self.assertEqual(self.kernel.doc(result["data"]["doc_id"]), [t for _, t in se.split_markdown(markdown)])
+
+    def test_new_top_note_costs_one_insert(self):
+        links = [f"{i:024x}" for i in range(200)]
+        result, _ = self.sync(report(links))
+        self.assertEqual(result["status"], "success")
+        markdown = report(["f" * 24] + links)
+        result, ops = self.sync(markdown)
+        self.assertEqual(ops, {"insertBlock": 1})
+        self.assert_synced(result, markdown)
+
+    def test_session_token_keeps_note_keys(self):
+        links = [f"{i:024x}" for i in range(3)]
+        self.sync(report(links, token="a"))
+        markdown = report(links, token="b")
+        result, ops = self.sync(markdown)
+        self.assertEqual(ops, {"updateBlock": 3})
+        self.assert_synced(result, markdown)
+
+    def test_unexpected_insert_response_keeps_state(self):
+        links = [f"{i:024x}" for i in range(4)]
+        self.kernel.fail("/block/insertBlock", {"code": 0, "msg": "", "data": None})
+        result, _ = self.sync(report(links))
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(len(result["data"]["failed"]), 1)
+        markdown = report(links)
+        result, ops = self.sync(markdown)
+        self.assertEqual(sum(ops.values()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
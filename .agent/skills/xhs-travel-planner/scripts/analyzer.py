@@ -6,17 +6,43 @@ Categorizes scraped notes by travel-related keywords.
 
 Usage:
     python analyzer.py --input xhs_results.json
+    python analyzer.py --input xhs_results_20260115_135802.jsonl
+    python analyzer.py --input notes.db --match "黄山 酒店" --since 30
+    python analyzer.py --input xhs_results_new.jsonl --incremental
+    python analyzer.py --input merged_archive.jsonl --stream
+    python analyzer.py --batch "xhs_results_*.jsonl" --workers 8
+    python analyzer.py --input xhs_results.jsonl --details     # title + fetched body/tags
+    python analyzer.py --input xhs_results.jsonl --scoring     # weighted scores, primary category
 """
 
+import os
+import glob
 import json
+import time
+import hashlib
 import argparse
+import sqlite3
+import tempfile
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+from dedup import DEFAULT_THRESHOLD, near_dedupe
+from detail import DETAILS_FILE, DetailCache, attach_details
+from matcher import KeywordMatcher
+from ranking import Ranker
+from notes import ANALYZED_FORMAT, Note, note_key, read_analyzed, read_notes, write_analyzed
+from scoring import CategoryScorer
+from store import NoteStore
+
 SCRIPT_DIR = Path(__file__).parent
 SKILL_DIR = SCRIPT_DIR.parent
 KEYWORDS_FILE = SKILL_DIR / "references" / "keywords.json"
 OUTPUT_DIR = SKILL_DIR / "output"
 
+# Notes scored per vectorized batch in --stream mode
+STREAM_CHUNK = 20000
+
 
 def load_keywords():
     """Load category keywords from config."""
@@ -33,51 +59,215 @@ def load_keywords():
     }
 
 
-def categorize_note(title: str, categories: dict) -> list:
-    """Return list of matching categories for a note."""
-    matched = []
-    title_lower = title.lower()
-    
-    for category, keywords in categories.items():
-        for keyword in keywords:
-            if keyword in title_lower or keyword in title:
-                matched.append(category)
-                break
+def load_matcher(categories: dict = None) -> KeywordMatcher:
+    """Build the keyword automaton once from config."""
+    return KeywordMatcher(categories if categories is not None else load_keywords())
+
+
+# Matchers built for callers that don't pass one, by id() of the categories
+# dict; the dict is kept here so its id can't be reused, and the keyword
+# counts rebuild the matcher if keywords are added or removed in place
+_MATCHERS = {}
+
+
+def categorize_note(title: str, categories: dict, matcher: KeywordMatcher = None) -> list:
+    """Return list of matching categories for a note.
+
+    Without a matcher, one is built once per keyword config and reused.
+    """
+    if matcher is None:
+        sizes = tuple(map(len, categories.values()))
+        entry = _MATCHERS.get(id(categories))
+        if entry is None or entry[1] != sizes:
+            entry = _MATCHERS[id(categories)] = (categories, sizes, KeywordMatcher(categories))
+        matcher = entry[2]
+    return matcher.categorize(title)
+
+
+def note_text(note) -> str:
+    """Text a note is categorized on: its title, plus body and tags when fetched."""
+    parts = [note.get('title', ''), note.get('desc', '')]
+    parts.extend(note.get('tags') or [])
+    return "\n".join(part for part in parts if part)
+
+
+def categorize_batch(notes: list, categories: dict, matcher: KeywordMatcher = None,
+                     scorer: CategoryScorer = None) -> list:
+    """Categories for each note.
+
+    With a scorer the whole batch is scored at once and each note also gets
+    `primary_category` and `category_scores` (confidence per category).
+    """
+    if scorer is None:
+        return [categorize_note(note_text(note), categories, matcher) for note in notes]
+    results = scorer.assign([note_text(note) for note in notes])
+    for note, (_, primary, confidences) in zip(notes, results):
+        note.extra = {**(note.extra or {}), 'primary_category': primary, 'category_scores': confidences}
+    return [cats for cats, _, _ in results]
+
+
+def keywords_hash(categories: dict) -> str:
+    """Fingerprint of the keyword config; a change invalidates the cache."""
+    config = json.dumps(categories, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(config.encode('utf-8')).hexdigest()
+
+
+def content_hash(note: dict) -> str:
+    """Hash of the note fields categorization depends on (title, body, tags)."""
+    return hashlib.sha1(note_text(note).encode('utf-8')).hexdigest()[:16]
+
+
+def load_cache(cache_file: Path) -> dict:
+    if cache_file.exists():
+        return json.loads(cache_file.read_text(encoding='utf-8'))
+    return {}
+
+
+def read_output(output_file: Path) -> dict:
+    """Load a previously written analyzed.json."""
+    return read_analyzed(output_file)
+
+
+def write_output(categorized: dict, output_file: Path, ranker: Ranker = None):
+    write_analyzed(categorized, output_file, ranker)
+
+
+def unique_notes(categorized: dict):
+    """Yield each note of an analyzed result once."""
+    seen = set()
+    for items in categorized.values():
+        for note in items:
+            key = note_key(note)
+            if key not in seen:
+                seen.add(key)
+                yield note
+
+
+def place_notes(categorized: dict, placements):
+    """Add (note, categories) pairs, skipping titles a category already has."""
+    seen_titles = {cat: {note['title'] for note in items} for cat, items in categorized.items()}
+    for note, matched_cats in placements:
+        for cat in matched_cats:
+            if cat not in categorized:
+                categorized[cat] = []
+                seen_titles[cat] = set()
+            if note['title'] not in seen_titles[cat]:
+                seen_titles[cat].add(note['title'])
+                categorized[cat].append(note)
+
+
+def analyze_notes(notes, categories: dict = None, matcher: KeywordMatcher = None,
+                  dedup_threshold: float = DEFAULT_THRESHOLD, scorer: CategoryScorer = None) -> dict:
+    """Categorize in-memory notes (no files read or written)."""
+    categories = categories if categories is not None else load_keywords()
+    matcher = matcher or load_matcher(categories)
+    notes = near_dedupe([Note.from_dict(note) for note in notes], dedup_threshold)
     
-    return matched if matched else ["其他"]
+    categorized = {cat: [] for cat in list(categories.keys()) + ["其他"]}
+    place_notes(categorized, zip(notes, categorize_batch(notes, categories, matcher, scorer)))
+    return categorized
+
+
+def load_input(input_file: Path, match: str = None, since: float = None, details: Path = None):
+    """Read notes from a scraper result file or the note store.
+
+    With `details` (a detail cache), fetched bodies and tags are attached.
+    """
+    if details:
+        cache = DetailCache(details)
+        try:
+            yield from attach_details(load_input(input_file, match, since), cache)
+        finally:
+            cache.close()
+        return
+    if input_file.suffix == '.db':
+        store = NoteStore(input_file)
+        try:
+            notes = store.search(match, since)
+            yield from map(Note.from_dict, notes)
+        finally:
+            store.close()
+    else:
+        yield from map(Note.from_dict, read_notes(input_file))
 
 
-def analyze(input_file: Path):
-    """Analyze and categorize notes."""
+def analyze(input_file: Path, match: str = None, since: float = None,
+            incremental: bool = False, output_file: Path = None,
+            dedup_threshold: float = DEFAULT_THRESHOLD, sort_by_score: bool = False,
+            details: Path = None, scoring: bool = False):
+    """Analyze and categorize notes.
+
+    A .db input is read from the note store, optionally filtered by title
+    terms (`match`) and recency in days (`since`). With `details`, notes are
+    categorized on their cached body and tags as well as the title.
+
+    With incremental=True only notes whose content hash is new or changed
+    are categorized and merged into the existing output; editing
+    keywords.json invalidates the cache and recategorizes everything.
+
+    Near-duplicate titles in the input are collapsed first (keeping the
+    most-liked copy); dedup_threshold=0 turns this off.
+
+    With scoring=True categories come from weighted keyword scores (see
+    scoring.py) and notes carry their primary category and confidences.
+    
+    The output holds each note once in a table, with per-category ID lists
+    (sorted by ranking score when sort_by_score is set).
+    """
     if not input_file.exists():
         print(f"[ERROR] File not found: {input_file}")
         return None
     
-    notes = json.loads(input_file.read_text(encoding='utf-8'))
+    output_file = output_file or OUTPUT_DIR / "analyzed.json"
+    cache_file = output_file.with_suffix('.cache.json')
+    
+    notes = near_dedupe(list(load_input(input_file, match, since, details)), dedup_threshold)
     categories = load_keywords()
+    matcher = load_matcher(categories)
+    scorer = CategoryScorer.from_config(categories) if scoring else None
+    kw_hash = keywords_hash(scorer.config() if scorer else categories)
     
-    # Categorize each note
-    categorized = {cat: [] for cat in categories.keys()}
-    categorized["其他"] = []
+    cache = load_cache(cache_file) if incremental else {}
+    if incremental and cache.get('keywords_hash') == kw_hash and output_file.exists():
+        categorized = read_output(output_file)
+        entries = cache.get('notes', {})
+    else:
+        if incremental and output_file.exists():
+            # Keywords changed (or no cache): recategorize the archived notes too
+            print("[INFO] Keyword config changed, recategorizing all notes")
+            notes = itertools.chain(list(unique_notes(read_output(output_file))), notes)
+        categorized = {}
+        entries = {}
     
+    for cat in list(categories.keys()) + ["其他"]:
+        categorized.setdefault(cat, [])
+    
+    # Categorize new or changed notes (in one batch, so scoring is vectorized)
+    changed = set()
+    pending = []
     for note in notes:
-        title = note.get('title', '')
-        matched_cats = categorize_note(title, categories)
-        
-        for cat in matched_cats:
-            if cat not in categorized:
-                categorized[cat] = []
-            categorized[cat].append(note)
-    
-    # Remove duplicates within categories
-    for cat in categorized:
-        seen_titles = set()
-        unique = []
-        for note in categorized[cat]:
-            if note['title'] not in seen_titles:
-                seen_titles.add(note['title'])
-                unique.append(note)
-        categorized[cat] = unique
+        key = note_key(note)
+        digest = content_hash(note)
+        entry = entries.get(key)
+        if entry and entry[0] == digest and key not in changed:
+            continue
+        entries[key] = [digest, None]
+        changed.add(key)
+        pending.append(note)
+    
+    placements = list(zip(pending, categorize_batch(pending, categories, matcher, scorer)))
+    for note, matched_cats in placements:
+        entries[note_key(note)][1] = matched_cats
+    
+    # Drop stale copies of changed notes, then merge (deduplicating titles)
+    for cat, items in categorized.items():
+        if items:
+            categorized[cat] = [note for note in items if note_key(note) not in changed]
+    
+    place_notes(categorized, placements)
+    
+    if incremental:
+        print(f"[INFO] Categorized {len(changed)} new or changed notes")
     
     # Statistics
     print("\n=== 分类统计 ===")
@@ -86,9 +276,9 @@ def analyze(input_file: Path):
             print(f"  {cat}: {len(items)} 篇")
     
     # Save result
-    output_file = OUTPUT_DIR / "analyzed.json"
-    output_file.write_text(
-        json.dumps(categorized, ensure_ascii=False, indent=2),
+    write_output(categorized, output_file, Ranker.from_config() if sort_by_score else None)
+    cache_file.write_text(
+        json.dumps({'keywords_hash': kw_hash, 'notes': entries}, ensure_ascii=False),
         encoding='utf-8'
     )
     print(f"\n[INFO] Analyzed results saved to {output_file}")
@@ -96,18 +286,241 @@ def analyze(input_file: Path):
     return categorized
 
 
+def _categorize_chunks(notes, categories: dict, matcher: KeywordMatcher, scorer: CategoryScorer = None):
+    """Yield (note, categories), categorizing STREAM_CHUNK notes at a time."""
+    while True:
+        chunk = list(itertools.islice(notes, STREAM_CHUNK))
+        if not chunk:
+            return
+        yield from zip(chunk, categorize_batch(chunk, categories, matcher, scorer))
+
+
+def analyze_stream(input_file: Path, output_file: Path = None, match: str = None, since: float = None,
+                   details: Path = None, scoring: bool = False):
+    """Categorize a result file of any size in constant memory.
+
+    Notes are read incrementally and written straight into the output's
+    note table. Duplicate titles are detected from 8-byte digests kept in
+    a temporary SQLite table (UNIQUE per category) next to the output, which
+    also holds each category's note IDs until they are written out in order.
+    """
+    if not input_file.exists():
+        print(f"[ERROR] File not found: {input_file}")
+        return None
+    
+    output_file = output_file or OUTPUT_DIR / "analyzed.json"
+    output_file.parent.mkdir(exist_ok=True)
+    categories = load_keywords()
+    matcher = load_matcher(categories)
+    scorer = CategoryScorer.from_config(categories) if scoring else None
+    
+    cat_ids = {cat: i for i, cat in enumerate(list(categories.keys()) + ["其他"])}
+    
+    fd, db_file = tempfile.mkstemp(suffix='.db', dir=output_file.parent)
+    os.close(fd)
+    db = sqlite3.connect(db_file)
+    tmp_file = output_file.with_suffix('.tmp')
+    try:
+        db.execute("PRAGMA journal_mode = OFF")
+        db.execute("PRAGMA synchronous = OFF")
+        db.execute("CREATE TABLE placed (cat INTEGER, digest INTEGER, id INTEGER, UNIQUE (cat, digest))")
+        place = "INSERT OR IGNORE INTO placed VALUES (?, ?, ?)"
+        
+        count = 0
+        with tmp_file.open('w', encoding='utf-8') as out:
+            out.write('{"format":%d,"notes":[' % ANALYZED_FORMAT)
+            notes = load_input(input_file, match, since, details)
+            for note, matched_cats in _categorize_chunks(notes, categories, matcher, scorer):
+                title = note.get('title', '')
+                digest = int.from_bytes(hashlib.blake2b(title.encode('utf-8'), digest_size=8).digest(),
+                                        'big', signed=True)
+                placed = False
+                for cat in matched_cats:
+                    cat_id = cat_ids.setdefault(cat, len(cat_ids))
+                    placed |= db.execute(place, (cat_id, digest, count)).rowcount > 0
+                if placed:
+                    out.write(("," if count else "") + json.dumps(note.to_dict(), ensure_ascii=False))
+                    count += 1
+            
+            # Sorted on disk, so category ID lists never have to fit in memory
+            db.execute("CREATE INDEX placed_ids ON placed (cat, id)")
+            totals = {cat: 0 for cat in cat_ids}
+            out.write('],"categories":{')
+            for i, (cat, cat_id) in enumerate(cat_ids.items()):
+                out.write(("," if i else "") + json.dumps(cat, ensure_ascii=False) + ":[")
+                rows = db.execute("SELECT id FROM placed WHERE cat = ? ORDER BY id", (cat_id,))
+                for j, (note_id,) in enumerate(rows):
+                    out.write(("," if j else "") + str(note_id))
+                    totals[cat] += 1
+                out.write("]")
+            out.write("}}")
+        tmp_file.replace(output_file)
+    finally:
+        db.close()
+        os.remove(db_file)
+    
+    # Statistics
+    print("\n=== 分类统计 ===")
+    for cat, total in totals.items():
+        if total:
+            print(f"  {cat}: {total} 篇")
+    print(f"\n[INFO] Analyzed results saved to {output_file}")
+    
+    return totals
+
+
+# Per-process state for batch workers: the automaton is built once per worker
+_worker_categories = None
+_worker_matcher = None
+_worker_scorer = None
+
+
+def _init_worker(categories: dict, scoring: bool = False):
+    global _worker_categories, _worker_matcher, _worker_scorer
+    _worker_categories = categories
+    _worker_matcher = load_matcher(categories)
+    _worker_scorer = CategoryScorer.from_config(categories) if scoring else None
+
+
+def _analyze_batch_file(input_file: Path, output_dir: Path, dedup_threshold: float,
+                        sort_by_score: bool) -> dict:
+    """Categorize one result file in a worker and write its output."""
+    notes = [Note.from_dict(note) for note in read_notes(input_file)]
+    count = len(notes)
+    destination = next((n['query'].split()[0] for n in notes if n.get('query')), "")
+    categorized = analyze_notes(notes, _worker_categories, _worker_matcher, dedup_threshold, _worker_scorer)
+    
+    # x.json -> analyzed_x.json, x.jsonl -> analyzed_x.jsonl.json, so both can coexist
+    name = input_file.stem if input_file.suffix == '.json' else input_file.name
+    output_file = output_dir / f"analyzed_{name}.json"
+    write_output(categorized, output_file, Ranker.from_config() if sort_by_score else None)
+    return {
+        'input': str(input_file),
+        'output': str(output_file),
+        'destination': destination,
+        'notes': count,
+        'categories': {cat: len(items) for cat, items in categorized.items()}
+    }
+
+
+def find_batch_inputs(pattern: str) -> list:
+    """Result files for a directory or glob, relative to cwd or output/.
+
+    A directory contributes only its scraper results (xhs_results_*), not the
+    analyzed output, caches or metrics that live next to them.
+    """
+    for base in (Path.cwd(), OUTPUT_DIR):
+        path = Path(pattern) if Path(pattern).is_absolute() else base / pattern
+        if path.is_dir():
+            files = [p for p in path.glob("xhs_results_*") if p.suffix in ('.json', '.jsonl')]
+        else:
+            files = [Path(p) for p in glob.glob(str(path))]
+        files = [p for p in files if not p.name.endswith('.checkpoint.json')]
+        if files:
+            return sorted(files)
+    return []
+
+
+def analyze_batch(pattern: str, workers: int = None, output_dir: Path = None,
+                  dedup_threshold: float = DEFAULT_THRESHOLD, sort_by_score: bool = False,
+                  scoring: bool = False) -> dict:
+    """Analyze many result files in parallel, one output per file plus a summary."""
+    inputs = find_batch_inputs(pattern)
+    if not inputs:
+        print(f"[ERROR] No result files match: {pattern}")
+        return None
+    
+    output_dir = output_dir or OUTPUT_DIR / "batch"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    categories = load_keywords()
+    workers = workers or os.cpu_count() or 1
+    print(f"[INFO] Analyzing {len(inputs)} files with {workers} workers")
+    
+    start = time.perf_counter()
+    files = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(categories, scoring)) as pool:
+        futures = {pool.submit(_analyze_batch_file, path, output_dir, dedup_threshold, sort_by_score): path for path in inputs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[ERROR] {futures[future].name}: {e}")
+                continue
+            files.append(result)
+            print(f"[INFO] {Path(result['input']).name}: {result['notes']} notes")
+    elapsed = time.perf_counter() - start
+    
+    files.sort(key=lambda r: r['input'])
+    totals = {}
+    for result in files:
+        for cat, count in result['categories'].items():
+            totals[cat] = totals.get(cat, 0) + count
+    notes = sum(r['notes'] for r in files)
+    summary = {
+        'files': files,
+        'notes': notes,
+        'totals': totals,
+        'workers': workers,
+        'elapsed_sec': round(elapsed, 3),
+        'notes_per_sec': round(notes / elapsed, 1) if elapsed else None
+    }
+    
+    summary_file = output_dir / "batch_summary.json"
+    summary_file.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
+    
+    print("\n=== 分类统计 ===")
+    for cat, count in totals.items():
+        if count:
+            print(f"  {cat}: {count} 篇")
+    print(f"\n[INFO] {notes} notes in {elapsed:.1f}s, summary saved to {summary_file}")
+    return summary
+
+
 def main():
     parser = argparse.ArgumentParser(description="XHS Content Analyzer")
-    parser.add_argument("--input", type=str, required=True, help="Input JSON file from scraper")
+    parser.add_argument("--input", type=str, help="Input JSON/JSONL file from scraper, or a note store .db")
+    parser.add_argument("--match", type=str, help="With a .db input: title terms to select")
+    parser.add_argument("--since", type=float, help="With a .db input: only notes seen in the last N days")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only categorize new/changed notes and merge them into the existing output")
+    parser.add_argument("--stream", action="store_true",
+                        help="Constant-memory mode for very large inputs (no incremental cache)")
+    parser.add_argument("--batch", type=str,
+                        help="Directory or glob of result files to analyze in parallel")
+    parser.add_argument("--workers", type=int, help="Batch worker processes (default: CPU count)")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Title similarity at which near-duplicates merge (0 disables; not used by --stream)")
+    parser.add_argument("--details", type=str, nargs='?', const=str(DETAILS_FILE),
+                        help="Also categorize on note bodies/tags from the detail cache (default output/details.db)")
+    parser.add_argument("--scoring", action="store_true",
+                        help="Assign categories by weighted keyword scores (vectorized with NumPy/SciPy "
+                             "when installed) and record each note's primary category")
+    parser.add_argument("--sort-by-score", action="store_true",
+                        help="Order each category's note IDs by ranking score")
     
     args = parser.parse_args()
+    
+    if args.batch:
+        analyze_batch(args.batch, args.workers, dedup_threshold=args.dedup_threshold,
+                      sort_by_score=args.sort_by_score, scoring=args.scoring)
+        return
+    if not args.input:
+        parser.error("--input or --batch is required")
     input_path = Path(args.input)
     
     # Handle relative paths
     if not input_path.is_absolute():
         input_path = OUTPUT_DIR / input_path
     
-    analyze(input_path)
+    details = Path(args.details) if args.details else None
+    if args.stream:
+        analyze_stream(input_path, match=args.match, since=args.since, details=details,
+                       scoring=args.scoring)
+    else:
+        analyze(input_path, args.match, args.since, incremental=args.incremental,
+                dedup_threshold=args.dedup_threshold, sort_by_score=args.sort_by_score,
+                details=details, scoring=args.scoring)
 
 
 if __name__ == "__main__":
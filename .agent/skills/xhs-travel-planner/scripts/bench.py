@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+XHS Travel Planner Benchmarks
+=============================
+Times the analyzer, visualizer and scraper extraction on the deterministic
+synthetic corpus from corpus.py and writes machine-readable JSON, so runs
+can be compared for regressions.
+
+Usage:
+    python bench.py                                  # 1k and 100k notes
+    python bench.py --sizes 1000 100000 1000000 --output bench_main.json
+    python bench.py --compare bench_main.json        # exit 1 on regressions
+"""
+
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+from importlib.util import find_spec
+from pathlib import Path
+
+from analyzer import analyze, analyze_notes, analyze_stream, categorize_note, load_keywords, load_matcher
+from corpus import generate_notes, render_search_html
+from dedup import near_dedupe
+from notes import Note, read_analyzed, write_analyzed
+from ranking import Ranker
+from scoring import CategoryScorer
+from visualizer import build_viewer_index, escape_mermaid, generate_markdown_report, generate_mindmap, write_viewer
+
+SCRIPT_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPT_DIR.parent
+OUTPUT_DIR = SKILL_DIR / "output"
+
+DEFAULT_SIZES = [1000, 100000]
+# Cards on the saved search page used for the extraction benchmark
+FIXTURE_CARDS = 200
+REGRESSION_TOLERANCE = 0.15
+
+
+def _measure(func, repeat: int) -> float:
+    """Best wall-clock time of `repeat` runs (GC paused while timing)."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def _quiet(func):
+    """Run an analyzer entry point without its console statistics."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+    return run
+
+
+def bench_size(size: int, repeat: int, workdir: Path) -> list:
+    raw = generate_notes(size)
+    notes = [Note.from_dict(note) for note in raw]
+    titles = [note.title for note in notes]
+    categories = load_keywords()
+    matcher = load_matcher(categories)
+    scorer = CategoryScorer.from_config(categories)
+    categorized = analyze_notes(notes, categories, matcher, dedup_threshold=0)
+    ranker = Ranker.from_config()
+    mindmap = generate_mindmap(categorized, "黄山", ranker)
+
+    input_file = workdir / f"corpus_{size}.jsonl"
+    with input_file.open('w', encoding='utf-8') as f:
+        for note in raw:
+            f.write(json.dumps(note, ensure_ascii=False) + "\n")
+    analyzed_file = workdir / f"analyzed_{size}.json"
+    write_analyzed(categorized, analyzed_file)
+
+    cases = {
+        'matcher.build': lambda: load_matcher(categories),
+        'analyzer.categorize_note': lambda: [categorize_note(t, categories, matcher) for t in titles],
+        'scoring.assign': lambda: scorer.assign(titles),
+        'dedup.near_dedupe': lambda: near_dedupe(notes),
+        'analyzer.analyze_notes': lambda: analyze_notes(notes, categories, matcher, dedup_threshold=0),
+        'analyzer.analyze': _quiet(lambda: analyze(input_file, output_file=workdir / "out.json")),
+        'analyzer.analyze_stream': _quiet(lambda: analyze_stream(input_file, workdir / "out_stream.json")),
+        'notes.write_analyzed': lambda: write_analyzed(categorized, workdir / "out_table.json"),
+        'notes.read_analyzed': lambda: read_analyzed(analyzed_file),
+        'visualizer.escape_mermaid': lambda: [escape_mermaid(t) for t in titles],
+        'ranking.top_k': lambda: [ranker.top_k(items, 10, cat) for cat, items in categorized.items()],
+        'visualizer.generate_mindmap': lambda: generate_mindmap(categorized, "黄山", ranker),
+        'visualizer.generate_markdown_report':
+            lambda: generate_markdown_report(categorized, "黄山", mindmap, ranker),
+        'visualizer.viewer': lambda: write_viewer(build_viewer_index(categorized, "黄山", ranker),
+                                                  workdir / "viewer.html"),
+    }
+
+    results = []
+    for name, func in cases.items():
+        # Whole-file stages are slow at the largest sizes; one run is enough there
+        runs = 1 if size >= 1000000 else repeat
+        seconds = _measure(func, runs)
+        results.append(_result(name, size, seconds, runs))
+        print(f"  {name:<38} {size:>8}  {seconds:>9.4f}s")
+    return results
+
+
+def bench_extraction(repeat: int, workdir: Path) -> list:
+    """Scraper card extraction against a saved HTML fixture (needs patchright + Chrome)."""
+    if find_spec('patchright') is None:
+        print("  [SKIP] scraper extraction: patchright not installed")
+        return []
+    from scraper import XHSScraper
+
+    fixture = workdir / "search_fixture.html"
+    fixture.write_text(render_search_html(generate_notes(FIXTURE_CARDS)), encoding='utf-8')
+
+    async def run():
+        results = []
+        for mode in ('batch', 'element'):
+            scraper = XHSScraper(extract_mode=mode)
+            try:
+                await scraper.start(headless=True)
+                await scraper.page.set_content(fixture.read_text(encoding='utf-8'))
+                best = float('inf')
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    records = await scraper._extract_cards(scraper.page)
+                    best = min(best, time.perf_counter() - start)
+                assert len(records) == FIXTURE_CARDS, f"{mode}: extracted {len(records)} cards"
+            finally:
+                # Do not touch the user's saved cookies from a benchmark
+                scraper.context = None
+                await scraper.close()
+            results.append(_result(f"scraper.extract_cards[{mode}]", FIXTURE_CARDS, best, repeat))
+            print(f"  {'scraper.extract_cards[' + mode + ']':<38} {FIXTURE_CARDS:>8}  {best:>9.4f}s")
+        return results
+
+    try:
+        return asyncio.run(run())
+    except Exception as e:
+        print(f"  [SKIP] scraper extraction: {e}")
+        return []
+
+
+def _result(name: str, size: int, seconds: float, runs: int) -> dict:
+    return {
+        'name': name,
+        'size': size,
+        'seconds': round(seconds, 6),
+        'per_item_us': round(seconds / size * 1e6, 3) if size else None,
+        'runs': runs
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(current: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> list:
+    """Print per-benchmark ratios; return the ones slower than baseline by > tolerance."""
+    base = {(r['name'], r['size']): r['seconds'] for r in baseline['results']}
+    regressions = []
+    print(f"\n=== 对比 {baseline['meta'].get('revision') or 'baseline'} ===")
+    for result in current['results']:
+        key = (result['name'], result['size'])
+        if key not in base or not base[key]:
+            continue
+        ratio = result['seconds'] / base[key]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  <-- regression"
+            regressions.append({**result, 'baseline_seconds': base[key], 'ratio': round(ratio, 3)})
+        elif ratio < 1 - tolerance:
+            flag = "  faster"
+        print(f"  {result['name']:<38} {result['size']:>8}  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XHS Travel Planner Benchmarks")
+    parser.add_argument("--sizes", type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Corpus sizes to run (e.g. 1000 100000 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (best is kept)")
+    parser.add_argument("--output", type=str, help="Results JSON (default output/bench/bench_<time>.json)")
+    parser.add_argument("--compare", type=str, help="Baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Slowdown ratio above which a benchmark counts as a regression")
+    parser.add_argument("--skip-scraper", action="store_true", help="Skip the browser extraction benchmark")
+
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for size in args.sizes:
+            print(f"[INFO] Benchmarking {size} notes...")
+            results.extend(bench_size(size, args.repeat, workdir))
+        if not args.skip_scraper:
+            print("[INFO] Benchmarking scraper extraction...")
+            results.extend(bench_extraction(args.repeat, workdir))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': args.sizes,
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+
+    output_path = Path(args.output) if args.output else \
+        OUTPUT_DIR / "bench" / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    if not output_path.is_absolute():
+        output_path = OUTPUT_DIR / "bench" / output_path
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"\n[INFO] Results saved to {output_path}")
+
+    if args.compare:
+        baseline_path = Path(args.compare)
+        if not baseline_path.is_absolute() and not baseline_path.exists():
+            baseline_path = OUTPUT_DIR / "bench" / baseline_path
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        if compare(report, baseline, args.tolerance):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+XHS Search Response Decoder
+===========================
+Decodes the JSON the search page fetches from its own API into note records,
+so the scraper can read notes from network responses instead of the DOM.
+
+Recorded response bodies (see `scraper.py --capture-dir`) can be replayed
+offline through the same decoder.
+
+Usage:
+    python capture.py --replay output/capture/ --query "黄山 攻略"
+"""
+
+import re
+import json
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from notes import parse_count
+
+SCRIPT_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPT_DIR.parent
+OUTPUT_DIR = SKILL_DIR / "output"
+
+XHS_URL = "https://www.xiaohongshu.com"
+SEARCH_API_PATH = "/api/sns/web/v1/search/notes"
+
+# Relative publish times on search cards: "3天前", "5小时前", "昨天 18:20"
+AGO = re.compile(r"^(\d+)\s*(分钟|小时|天)前$")
+AGO_UNITS = {'分钟': 'minutes', '小时': 'hours', '天': 'days'}
+
+
+def is_search_response(url: str) -> bool:
+    """True for the search API calls made by the results page."""
+    return SEARCH_API_PATH in url
+
+
+def publish_time(card: dict, now: datetime = None):
+    """Publish time of a note card: the API's epoch `time` (ms), else its
+    publish_time corner tag as an ISO date; None if unknown."""
+    if card.get('time'):
+        return card['time']
+    text = next((tag.get('text') or '' for tag in card.get('corner_tag_info') or []
+                 if tag.get('type') == 'publish_time'), '').strip()
+    if not text:
+        return None
+    now = now or datetime.now()
+    ago = AGO.match(text)
+    if ago:
+        return (now - timedelta(**{AGO_UNITS[ago.group(2)]: int(ago.group(1))})).isoformat(timespec='minutes')
+    if text == '刚刚':
+        return now.isoformat(timespec='minutes')
+    if text.startswith('昨天'):
+        return (now - timedelta(days=1)).date().isoformat()
+    for fmt in ('%Y-%m-%d', '%m-%d'):
+        try:
+            date = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if fmt == '%m-%d':
+            # Cards omit the year for dates within the last year
+            date = date.replace(year=now.year if (date.month, date.day) <= (now.month, now.day) else now.year - 1)
+        return date.date().isoformat()
+    return None
+
+
+def decode_search_payload(payload: dict, query: str = "") -> list:
+    """Turn one search API response body into note records."""
+    if not payload or not payload.get('success', True):
+        return []
+
+    records = []
+    for item in (payload.get('data') or {}).get('items') or []:
+        card = item.get('note_card')
+        if item.get('model_type', 'note') != 'note' or not card:
+            continue
+
+        note_id = item.get('id') or card.get('note_id', '')
+        if not note_id:
+            continue
+
+        link = f"{XHS_URL}/explore/{note_id}"
+        if item.get('xsec_token'):
+            link += f"?xsec_token={item['xsec_token']}&xsec_source=pc_search"
+
+        user = card.get('user') or {}
+        interact = card.get('interact_info') or {}
+        record = {
+            'title': (card.get('display_title') or card.get('title') or '').strip(),
+            'author': (user.get('nickname') or user.get('nick_name') or '').strip(),
+            'link': link,
+            'likes': str(interact.get('liked_count', '0')),
+            'likes_count': parse_count(interact.get('liked_count')),
+            'query': query,
+            'note_id': note_id,
+            'type': card.get('type', ''),
+            'collects': str(interact.get('collected_count', '0')),
+            'comments': str(interact.get('comment_count', '0')),
+            'shares': str(interact.get('shared_count', '0')),
+        }
+        published = publish_time(card)
+        if published:
+            record['time'] = published
+        records.append(record)
+
+    return records
+
+
+def replay(paths, query: str = "") -> list:
+    """Decode recorded response bodies from disk, deduplicated by note ID."""
+    files = []
+    for path in paths:
+        path = Path(path)
+        files.extend(sorted(path.glob("*.json")) if path.is_dir() else [path])
+
+    notes = []
+    seen = set()
+    for file in files:
+        payload = json.loads(file.read_text(encoding='utf-8'))
+        for record in decode_search_payload(payload, query):
+            if record['note_id'] not in seen:
+                seen.add(record['note_id'])
+                notes.append(record)
+
+    print(f"[INFO] Replayed {len(files)} responses, {len(notes)} notes")
+    return notes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XHS Search Response Decoder")
+    parser.add_argument("--replay", type=str, nargs='+', required=True,
+                        help="Recorded response files or directories")
+    parser.add_argument("--query", type=str, default="", help="Query to tag the notes with")
+    parser.add_argument("--output", type=str, help="Write decoded notes to this JSON file")
+
+    args = parser.parse_args()
+    notes = replay(args.replay, args.query)
+
+    if args.output:
+        output_path = Path(args.output)
+        if not output_path.is_absolute():
+            output_path = OUTPUT_DIR / output_path
+        OUTPUT_DIR.mkdir(exist_ok=True)
+        output_path.write_text(json.dumps(notes, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"[INFO] Results saved to {output_path}")
+    else:
+        print(json.dumps(notes, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Synthetic Note Corpus
+=====================
+Deterministic generator of realistic Xiaohongshu travel notes (titles,
+authors, likes strings, links) for benchmarks, plus a search-results HTML
+page with the same cards for scraper extraction benchmarks.
+
+Usage:
+    python corpus.py --size 100000 --output corpus_100k.jsonl
+    python corpus.py --size 200 --html search_fixture.html
+"""
+
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+from html import escape
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPT_DIR.parent
+OUTPUT_DIR = SKILL_DIR / "output"
+
+DESTINATIONS = ["黄山", "杭州", "西湖", "成都", "重庆", "西安", "厦门", "大理", "丽江", "桂林",
+                "三亚", "青岛", "苏州", "南京", "张家界", "九寨沟", "稻城亚丁", "婺源", "宏村", "千岛湖"]
+TOPICS = ["攻略", "交通攻略", "住宿推荐", "酒店测评", "民宿", "美食", "必吃榜", "小吃", "省钱攻略",
+          "门票优惠", "学生党", "大学生穷游", "行程规划", "避坑指南", "路线", "自驾", "高铁直达",
+          "日出", "云海", "拍照机位", "周末去哪", "亲子游", "特种兵", "citywalk", "Vlog"]
+DURATIONS = ["一日游", "两天一夜", "三天两晚", "3天2晚", "4天3晚", "五日游", "2日", "周末"]
+HOOKS = ["超详细", "保姆级", "建议收藏", "人少景美", "不踩雷", "亲测", "真的绝了", "本地人推荐",
+         "第一次去必看", "附费用清单", "一篇搞定", "少走弯路"]
+SEPARATORS = ["｜", " | ", "！", "，", " ", "～", "丨", ""]
+EMOJI = ["", "", "", "🔥", "✨", "⛰️", "🚄", "🏨", "🍜", "💰", "📸"]
+NICK_CHARS = "小大阿柚子橙桃栗糖果米花星月云风雨雪山海鹿猫兔熊喵叮咚"
+NICK_SUFFIXES = ["", "", "酱", "呀", "的旅行日记", "去旅行", "爱吃饭", "_", "2024", "Lucky"]
+
+
+def _likes(rng: random.Random) -> str:
+    """Likes as XHS renders them: '赞', plain counts, '999+', '1.2万', '3.4w'."""
+    roll = rng.random()
+    if roll < 0.05:
+        return "赞"
+    if roll < 0.6:
+        return str(int(rng.paretovariate(1.2) * 10))
+    if roll < 0.7:
+        return "999+"
+    if roll < 0.75:
+        return f"{rng.randint(1, 9)}k"
+    value = rng.paretovariate(1.5)
+    unit = "万" if rng.random() < 0.8 else "w"
+    return f"{min(value, 99):.1f}{unit}"
+
+
+def _title(rng: random.Random, destination: str) -> str:
+    parts = [destination, rng.choice(TOPICS)]
+    if rng.random() < 0.6:
+        parts.append(rng.choice(SEPARATORS) + rng.choice(DURATIONS))
+    if rng.random() < 0.7:
+        parts.append(rng.choice(SEPARATORS) + rng.choice(HOOKS))
+    return "".join(parts) + rng.choice(EMOJI)
+
+
+def generate_notes(size: int, seed: int = 42) -> list:
+    """Generate `size` scraper-shaped note dicts; same seed, same corpus."""
+    rng = random.Random(seed)
+    authors = [
+        "".join(rng.choice(NICK_CHARS) for _ in range(rng.randint(2, 4))) + rng.choice(NICK_SUFFIXES)
+        for _ in range(max(50, size // 20))
+    ]
+    base_time = datetime(2026, 1, 15, 12, 0, 0)
+    notes = []
+    for _ in range(size):
+        destination = rng.choice(DESTINATIONS)
+        likes = _likes(rng)
+        notes.append({
+            'title': _title(rng, destination),
+            'author': rng.choice(authors),
+            'link': f"https://www.xiaohongshu.com/explore/{rng.getrandbits(96):024x}",
+            'likes': likes,
+            'query': f"{destination} {rng.choice(['攻略', '交通', '住宿', '美食', '优惠 白嫖', '学生优惠'])}",
+            'scraped_at': (base_time - timedelta(minutes=rng.randint(0, 90 * 24 * 60))).isoformat()
+        })
+    return notes
+
+
+def render_search_html(notes: list) -> str:
+    """A search results page whose cards match the scraper's selectors."""
+    cards = []
+    for note in notes:
+        href = note['link'].replace("https://www.xiaohongshu.com", "")
+        cards.append(
+            '<section class="note-item">'
+            f'<a href="{escape(href)}" class="cover"><img src="data:,"></a>'
+            '<div class="footer">'
+            f'<a class="title"><span>{escape(note["title"])}</span></a>'
+            '<div class="card-bottom-wrapper">'
+            f'<a class="author"><span class="name">{escape(note["author"])}</span></a>'
+            f'<span class="like-wrapper"><span class="count">{escape(note["likes"])}</span></span>'
+            '</div></div></section>'
+        )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>search_result</title></head>'
+        '<body><div class="feeds-page"><div class="feeds-container">'
+        + "".join(cards) +
+        '</div></div></body></html>'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic XHS note corpus")
+    parser.add_argument("--size", type=int, default=1000, help="Number of notes")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", type=str, help="Write notes to this .json/.jsonl file")
+    parser.add_argument("--html", type=str, help="Write a search results HTML fixture")
+
+    args = parser.parse_args()
+    notes = generate_notes(args.size, args.seed)
+
+    for name, render in ((args.output, None), (args.html, render_search_html)):
+        if not name:
+            continue
+        path = Path(name)
+        if not path.is_absolute():
+            path = OUTPUT_DIR / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if render:
+            path.write_text(render(notes), encoding='utf-8')
+        elif path.suffix == '.jsonl':
+            with path.open('w', encoding='utf-8') as f:
+                for note in notes:
+                    f.write(json.dumps(note, ensure_ascii=False) + "\n")
+        else:
+            path.write_text(json.dumps(notes, ensure_ascii=False), encoding='utf-8')
+        print(f"[INFO] {len(notes)} notes written to {path}")
+
+
+if __name__ == "__main__":
+    main()
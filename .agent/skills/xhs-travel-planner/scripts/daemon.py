@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+XHS Scrape Daemon
+=================
+Keeps one warm, logged-in browser and serves scrape jobs to thin clients,
+so a small query costs its scrape time instead of a Chrome launch.
+
+The daemon listens on a local TCP socket and speaks JSON lines. A client
+sends one job per connection; notes stream back as they are extracted,
+followed by a final "done" (or "error") message:
+
+    -> {"op": "search", "query": "黄山 攻略", "limit": 30}
+    -> {"op": "destination", "destination": "黄山", "limit_per_query": 5}
+    -> {"op": "stats"} | {"op": "ping"} | {"op": "shutdown"}
+    <- {"type": "note", "query": "黄山 攻略", "note": {...}}
+    <- {"type": "done", "notes": 30, "seconds": 41.2, "blocked": []}
+
+Queries from all jobs share a pool of pages and one rate limiter.
+
+Usage:
+    python daemon.py serve --pages 3 --headless        # start the daemon
+    python daemon.py search --query "黄山" --limit 30  # thin client
+    python daemon.py search --destination "黄山" --output huangshan.jsonl
+    python daemon.py stats | python daemon.py stop
+"""
+
+import asyncio
+import json
+import time
+import argparse
+from datetime import datetime
+
+from notes import dedupe_notes, note_key
+from options import add_scraper_arguments, output_file, scraper_options
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Per-line read limit; capture-mode notes carry extra fields
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+def _message(**fields) -> bytes:
+    return (json.dumps(fields, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+class ScrapeDaemon:
+    """Serves jobs on a pool of pages in one browser context."""
+
+    def __init__(self, scraper, pages: int = 2):
+        self.scraper = scraper
+        self.pages = max(1, pages)
+        self.pool = asyncio.Queue()
+        self.started = time.monotonic()
+        self.jobs = 0
+        self.active = 0
+        self._server = None
+
+    async def start(self, headless: bool = True):
+        await self.scraper.start(headless=headless)
+        self.pool.put_nowait(self.scraper.page)
+        for _ in range(self.pages - 1):
+            self.pool.put_nowait(await self.scraper.context.new_page())
+
+    async def close(self):
+        # self.scraper.page is closed with the browser
+        await self.scraper.close()
+
+    async def _run_query(self, query: str, limit: int, writer, blocked: dict) -> list:
+        """Scrape one query on a pooled page, streaming notes to `writer`;
+        a login wall or captcha is recorded in the job's `blocked`."""
+        def send(note):
+            if not writer.is_closing():
+                writer.write(_message(type='note', query=query, note=note))
+
+        page = await self.pool.get()
+        try:
+            notes = await self.scraper.search(query, limit=limit, page=page, on_note=send, blocked=blocked)
+            await self.scraper._pace('between')
+        except Exception:
+            # A crashed or wedged tab is replaced rather than handed to the next job
+            if page is not self.scraper.page:
+                await page.close()
+                page = await self.scraper.context.new_page()
+            raise
+        finally:
+            self.pool.put_nowait(page)
+        return notes
+
+    async def run_job(self, job: dict, writer):
+        start = time.perf_counter()
+        op = job.get('op')
+        if op == 'search':
+            queries = [job['query']]
+            limit = int(job.get('limit', 30))
+        else:
+            from scraper import search_queries
+            queries = search_queries(job['destination'])
+            limit = int(job.get('limit_per_query', 10))
+
+        self.jobs += 1
+        self.active += 1
+        # Per job, so concurrent jobs don't report each other's blocked queries
+        blocked = {}
+        try:
+            per_query = await asyncio.gather(*(self._run_query(q, limit, writer, blocked) for q in queries))
+        finally:
+            self.active -= 1
+
+        total = len(dedupe_notes(n for notes in per_query for n in notes))
+        self.scraper.telemetry.write_metrics()
+        await self.scraper.save_cookies()
+        writer.write(_message(type='done', notes=total, blocked=[q for q in queries if q in blocked],
+                              seconds=round(time.perf_counter() - start, 3)))
+
+    def stats(self) -> dict:
+        return {
+            'uptime_seconds': round(time.monotonic() - self.started, 1),
+            'pages': self.pages,
+            'idle_pages': self.pool.qsize(),
+            'jobs': self.jobs,
+            'active_jobs': self.active,
+            **self.scraper.telemetry.summary()
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            try:
+                job = json.loads(line)
+                op = job['op']
+            except (json.JSONDecodeError, KeyError, TypeError):
+                writer.write(_message(type='error', error="Expected one JSON object with an 'op'"))
+                return
+
+            if op == 'ping':
+                writer.write(_message(type='pong'))
+            elif op == 'stats':
+                writer.write(_message(type='stats', **self.stats()))
+            elif op == 'shutdown':
+                writer.write(_message(type='done'))
+                self._server.close()
+            elif op in ('search', 'destination'):
+                print(f"[INFO] Job: {json.dumps(job, ensure_ascii=False)}")
+                try:
+                    await self.run_job(job, writer)
+                except KeyError as e:
+                    writer.write(_message(type='error', error=f"Missing field: {e}"))
+                except Exception as e:
+                    print(f"[ERROR] Job failed: {e}")
+                    writer.write(_message(type='error', error=str(e)))
+            else:
+                writer.write(_message(type='error', error=f"Unknown op: {op}"))
+        finally:
+            if not writer.is_closing():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    pass
+                writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self._server = await asyncio.start_server(self.handle, host, port, limit=STREAM_LIMIT)
+        print(f"[INFO] Daemon listening on {host}:{port} with {self.pages} pages")
+        try:
+            async with self._server:
+                await self._server.wait_closed()
+        except asyncio.CancelledError:
+            pass
+        print("[INFO] Daemon stopped.")
+
+
+async def request(job: dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Send one job to the daemon and yield its reply messages."""
+    try:
+        reader, writer = await asyncio.open_connection(host, port, limit=STREAM_LIMIT)
+    except OSError as e:
+        raise ConnectionError(f"No daemon on {host}:{port} ({e}); start one with: python daemon.py serve")
+    try:
+        writer.write(_message(**job))
+        await writer.drain()
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            yield json.loads(line)
+    finally:
+        writer.close()
+
+
+async def fetch(job: dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> tuple:
+    """Run a scrape job to completion; return (notes, final message)."""
+    notes = []
+    final = {}
+    async for message in request(job, host, port):
+        if message['type'] == 'note':
+            notes.append(message['note'])
+        else:
+            final = message
+    if final.get('type') == 'error':
+        raise RuntimeError(final['error'])
+    return dedupe_notes(notes), final
+
+
+async def serve(args):
+    # The browser side is only needed here, not by clients
+    from ratelimit import TokenBucket
+    from scraper import XHSScraper
+    from telemetry import Telemetry
+
+    scraper = XHSScraper(
+        extract_mode=args.extract,
+        limiter=TokenBucket(args.rate, args.burst),
+        telemetry=Telemetry(output_file(args.trace), output_file(args.metrics)),
+        retain=False,
+        **scraper_options(args)
+    )
+    daemon = ScrapeDaemon(scraper, pages=args.pages)
+    try:
+        await daemon.start(headless=args.headless)
+        await daemon.serve(args.host, args.port)
+    finally:
+        await daemon.close()
+
+
+async def submit(args):
+    if args.destination:
+        job = {'op': 'destination', 'destination': args.destination, 'limit_per_query': args.limit // 6}
+    else:
+        job = {'op': 'search', 'query': args.query, 'limit': args.limit}
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = output_file(args.output or f"xhs_results_{timestamp}.jsonl")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    seen = set()
+    final = {}
+    with output_path.open('w', encoding='utf-8') as f:
+        async for message in request(job, args.host, args.port):
+            if message['type'] != 'note':
+                final = message
+                continue
+            note = message['note']
+            key = note_key(note)
+            if key not in seen:
+                seen.add(key)
+                f.write(json.dumps(note, ensure_ascii=False) + "\n")
+                f.flush()
+
+    if final.get('type') == 'error':
+        print(f"[ERROR] {final['error']}")
+        raise SystemExit(1)
+    print(f"[INFO] {len(seen)} notes in {final.get('seconds', 0):.1f}s")
+    if final.get('blocked'):
+        print(f"[WARN] No notes (login wall/captcha?) for: {', '.join(final['blocked'])}")
+    print(f"[INFO] Results saved to {output_path}")
+
+
+async def control(args):
+    async for message in request({'op': args.command}, args.host, args.port):
+        print(json.dumps(message, ensure_ascii=False, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XHS Scrape Daemon")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help="Daemon address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Daemon port")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    server = commands.add_parser('serve', help="Start the daemon")
+    server.add_argument("--pages", type=int, default=2, help="Pages in the pool")
+    server.add_argument("--headless", action="store_true", help="Run in headless mode")
+    add_scraper_arguments(server)
+    server.add_argument("--trace", type=str, help="Append scrape events to this JSONL file")
+    server.add_argument("--metrics", type=str, help="Prometheus textfile, rewritten after every job")
+
+    client = commands.add_parser('search', help="Submit a scrape job to a running daemon")
+    target = client.add_mutually_exclusive_group(required=True)
+    target.add_argument("--query", type=str, help="Search query")
+    target.add_argument("--destination", type=str, help="Destination for multi-query search")
+    client.add_argument("--limit", type=int, default=30, help="Max notes to scrape")
+    client.add_argument("--output", type=str, help="JSONL output file (under output/ unless absolute)")
+
+    commands.add_parser('stats', help="Print daemon statistics")
+    commands.add_parser('ping', help="Check that the daemon is up")
+    commands.add_parser('stop', help="Shut the daemon down")
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        run = serve(args)
+    elif args.command == 'search':
+        run = submit(args)
+    else:
+        args.command = 'shutdown' if args.command == 'stop' else args.command
+        run = control(args)
+
+    try:
+        asyncio.run(run)
+    except ConnectionError as e:
+        print(f"[ERROR] {e}")
+        raise SystemExit(1)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection
+========================
+MinHash + LSH banding over normalized titles, so reposts and lightly edited
+copies ("黄山攻略｜三天两晚" vs "黄山攻略 | 3天2晚") collapse to one note.
+
+Only notes that share an LSH bucket are compared, so the stage runs in
+near-linear time. A candidate joins a cluster only if its exact shingle
+Jaccard with the cluster's first title reaches the threshold, so noisy
+estimates and chains of pairs can't merge unrelated titles. Notes found
+under different destinations are never merged: "杭州避坑指南" and
+"苏州避坑指南" differ by one character but are different notes. Each
+cluster keeps its highest-engagement copy.
+
+Usage:
+    python dedup.py --input xhs_results.jsonl --threshold 0.8
+"""
+
+import random
+import hashlib
+import argparse
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+from notes import parse_count, read_notes
+
+SCRIPT_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPT_DIR.parent
+OUTPUT_DIR = SKILL_DIR / "output"
+
+DEFAULT_THRESHOLD = 0.8
+NUM_PERM = 64
+SHINGLE_SIZE = 2
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(20260115)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+
+_NUMERALS = str.maketrans("零〇一二两三四五六七八九", "001223456789")
+
+
+def normalize_title(title: str) -> str:
+    """Fold width, case, Chinese digits; drop whitespace, punctuation and emoji."""
+    text = unicodedata.normalize('NFKC', title).lower().translate(_NUMERALS)
+    return "".join(ch for ch in text if unicodedata.category(ch)[0] not in "PSZC")
+
+
+def shingles(text: str) -> set:
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+@lru_cache(maxsize=1 << 18)
+def _permuted(shingle: str) -> tuple:
+    """All permuted hash values of one shingle (titles share most bigrams)."""
+    # Not hash(): str hashes are salted per process, which would change results between runs
+    h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big') & _MERSENNE
+    return tuple((a * h + b) % _MERSENNE for a, b in _PERMUTATIONS)
+
+
+def minhash(text: str) -> tuple:
+    """MinHash signature of a normalized title."""
+    return tuple(map(min, zip(*map(_permuted, shingles(text)))))
+
+
+def choose_bands(threshold: float) -> tuple:
+    """Pick (bands, rows) whose LSH S-curve threshold is highest at or below `threshold`.
+
+    Candidates are verified exactly, so the bands err towards recall.
+    """
+    options = [(b, NUM_PERM // b) for b in range(1, NUM_PERM + 1) if NUM_PERM % b == 0]
+    below = [br for br in options if (1 / br[0]) ** (1 / br[1]) <= threshold]
+    return max(below, key=lambda br: (1 / br[0]) ** (1 / br[1])) if below else max(options)
+
+
+def jaccard(a: set, b: set) -> float:
+    """Exact Jaccard similarity of two shingle sets."""
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def near_duplicate_clusters(titles: list, threshold: float = DEFAULT_THRESHOLD, groups: list = None) -> list:
+    """Return a cluster id for each title (equal ids = near duplicates).
+
+    Titles with different `groups` entries (e.g. destinations) never share a cluster.
+    """
+    groups = groups or [None] * len(titles)
+    parent = list(range(len(titles)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Identical normalized titles need no signature at all
+    exact = {}
+    reps = []
+    for i, (title, group) in enumerate(zip(titles, groups)):
+        norm = normalize_title(title)
+        if (group, norm) in exact:
+            parent[i] = exact[group, norm]
+        else:
+            exact[group, norm] = i
+            reps.append((i, norm))
+
+    # Each title is checked against cluster representatives (a cluster's
+    # first title) only, and joins at most one cluster, so clusters never chain
+    bands, rows = choose_bands(threshold)
+    shingle_sets = {}
+    buckets = {}
+    for i, norm in reps:
+        sig = minhash(norm)
+        own = shingle_sets[i] = shingles(norm)
+        keys = [(groups[i], band, sig[band * rows:(band + 1) * rows]) for band in range(bands)]
+        checked = set()
+        for key in keys:
+            for j in buckets.get(key, ()):
+                root = find(j)
+                if root in checked:
+                    continue
+                checked.add(root)
+                if jaccard(own, shingle_sets[root]) >= threshold:
+                    parent[i] = root
+                    break
+            if parent[i] != i:
+                break
+        for key in keys:
+            buckets.setdefault(key, []).append(i)
+
+    return [find(i) for i in range(len(titles))]
+
+
+def destination(note) -> str:
+    """Destination a note was searched under (first word of its query)."""
+    words = (note.get('query') or '').split()
+    return words[0] if words else ''
+
+
+def near_dedupe(notes: list, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """Keep the highest-engagement note of each near-duplicate cluster, in input order."""
+    if not threshold:
+        return list(notes)
+    clusters = near_duplicate_clusters([n.get('title', '') for n in notes], threshold,
+                                       [destination(n) for n in notes])
+
+    best = {}
+    for i, cluster in enumerate(clusters):
+        if cluster not in best or parse_count(notes[i].get('likes')) > parse_count(notes[best[cluster]].get('likes')):
+            best[cluster] = i
+    keep = sorted(best.values())
+    return [notes[i] for i in keep]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XHS Near-Duplicate Detection")
+    parser.add_argument("--input", type=str, required=True, help="Scraper result file (.json/.jsonl)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Jaccard similarity of title shingles to merge at")
+
+    args = parser.parse_args()
+    input_path = Path(args.input)
+    if not input_path.is_absolute():
+        input_path = OUTPUT_DIR / input_path
+
+    notes = list(read_notes(input_path))
+    unique = near_dedupe(notes, args.threshold)
+    kept = {id(n) for n in unique}
+    print(f"[INFO] {len(notes)} notes, {len(unique)} after near-duplicate removal")
+    for note in notes:
+        if id(note) not in kept:
+            print(f"  - {note.get('title', '')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+XHS Note Details
+================
+Body text and tags of individual notes, for categorizing on more than the
+card title.
+
+Details are fetched by `scraper.py --details` (or this script's --input)
+and kept in an on-disk LRU cache keyed by note ID: entries expire after a
+TTL and the least recently used ones are evicted once the cache outgrows
+its size cap, so re-runs never fetch a note twice.
+
+Usage:
+    python detail.py --input xhs_results_20260115_135802.jsonl --concurrency 2
+    python detail.py --stats
+    python analyzer.py --input xhs_results.jsonl --details
+"""
+
+import re
+import json
+import time
+import asyncio
+import argparse
+import sqlite3
+from pathlib import Path
+
+from notes import Note, note_key, read_notes
+
+SCRIPT_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPT_DIR.parent
+OUTPUT_DIR = SKILL_DIR / "output"
+DETAILS_FILE = OUTPUT_DIR / "details.db"
+
+DEFAULT_MAX_MB = 64
+DEFAULT_TTL_DAYS = 30
+# Longer bodies are cut; the keywords that matter appear early
+MAX_BODY_CHARS = 5000
+# Inline topic markers in note bodies, e.g. "#黄山[话题]#"
+TOPIC_MARKER = re.compile(r'#([^#\s]+?)\[话题\]#')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS details (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS details_used ON details(used_at);
+"""
+
+# Reads the note from the page's initial state, falling back to the DOM
+EXTRACT_DETAIL_JS = """
+(id) => {
+    let note = null;
+    try {
+        const map = window.__INITIAL_STATE__.note.noteDetailMap;
+        const entry = map[id] || Object.values(map)[0];
+        note = entry && entry.note;
+    } catch (e) {}
+    if (note && (note.desc || note.title)) {
+        return {
+            title: note.title || '',
+            desc: note.desc || '',
+            tags: (note.tagList || []).map((t) => t.name),
+            time: note.time || null,
+        };
+    }
+    const text = (sel) => {
+        const el = document.querySelector(sel);
+        return el ? el.innerText : '';
+    };
+    if (!text('#detail-desc') && !text('#detail-title')) return null;
+    return {
+        title: text('#detail-title'),
+        desc: text('#detail-desc'),
+        tags: Array.from(document.querySelectorAll('#detail-desc a.tag, a#hash-tag'), (a) => a.innerText),
+        time: null,
+    };
+}
+"""
+
+
+def decode_detail(raw: dict) -> dict:
+    """Clean an extracted detail: topic markers become tags, body is capped."""
+    tags = [tag.strip().strip('#') for tag in raw.get('tags') or []]
+    desc = raw.get('desc') or ''
+    tags.extend(TOPIC_MARKER.findall(desc))
+    desc = TOPIC_MARKER.sub('', desc).strip()[:MAX_BODY_CHARS]
+    return {
+        'title': (raw.get('title') or '').strip(),
+        'desc': desc,
+        'tags': list(dict.fromkeys(tag for tag in tags if tag)),
+        'time': raw.get('time'),
+    }
+
+
+class DetailCache:
+    """Size-capped LRU of note details in SQLite, with a TTL."""
+
+    def __init__(self, path: Path = DETAILS_FILE, max_bytes: int = DEFAULT_MAX_MB << 20,
+                 ttl_days: float = DEFAULT_TTL_DAYS):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl_days * 86400
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM details").fetchone()[0]
+
+    def get(self, key: str):
+        """Fresh cached detail for `key`, or None; marks it recently used."""
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT data FROM details WHERE key = ? AND fetched_at >= ?", (key, now - self.ttl)
+        ).fetchone()
+        if not row:
+            return None
+        self.conn.execute("UPDATE details SET used_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def __contains__(self, key: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM details WHERE key = ? AND fetched_at >= ?", (key, time.time() - self.ttl)
+        ).fetchone() is not None
+
+    def put(self, key: str, detail: dict):
+        data = json.dumps(detail, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        now = time.time()
+        old = self.conn.execute("SELECT size FROM details WHERE key = ?", (key,)).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO details (key, data, size, fetched_at, used_at) VALUES (?, ?, ?, ?, ?)",
+            (key, data, size, now, now)
+        )
+        self.size += size - (old[0] if old else 0)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under the cap."""
+        self.conn.execute("DELETE FROM details WHERE fetched_at < ?", (time.time() - self.ttl,))
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM details").fetchone()[0]
+        if self.size <= self.max_bytes:
+            return
+        # Free a little extra so a full cache does not evict on every put
+        target = self.max_bytes * 0.9
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM details ORDER BY used_at"):
+            if self.size <= target:
+                break
+            doomed.append((key,))
+            self.size -= size
+        self.conn.executemany("DELETE FROM details WHERE key = ?", doomed)
+
+    def stats(self) -> dict:
+        total, expired = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(fetched_at < ?), 0) FROM details", (time.time() - self.ttl,)
+        ).fetchone()
+        return {'entries': total, 'expired': expired, 'bytes': self.size, 'max_bytes': self.max_bytes}
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def attach_details(notes, cache: DetailCache):
+    """Yield notes with `desc`, `tags` and publish `time` filled in from the cache where known."""
+    for note in notes:
+        detail = cache.get(note_key(note))
+        if detail:
+            note = Note.from_dict(note)
+            extra = {**(note.extra or {}), 'desc': detail['desc'], 'tags': detail['tags']}
+            if detail.get('time'):
+                extra['time'] = detail['time']
+            note.extra = extra
+        yield note
+
+
+async def fetch(input_file: Path, cache: DetailCache, concurrency: int, headless: bool):
+    # The browser side is only needed here
+    from ratelimit import TokenBucket
+    from scraper import XHSScraper
+
+    notes = list(read_notes(input_file))
+    scraper = XHSScraper(limiter=TokenBucket(20, 3))
+    try:
+        await scraper.start(headless=headless)
+        await scraper.fetch_details(notes, cache, concurrency)
+    finally:
+        await scraper.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XHS Note Details")
+    parser.add_argument("--input", type=str, help="Fetch details for the notes in this result file")
+    parser.add_argument("--cache", type=str, default=str(DETAILS_FILE), help="Detail cache database")
+    parser.add_argument("--cache-mb", type=float, default=DEFAULT_MAX_MB, help="Cache size cap in MB")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL_DAYS, help="Days before a cached detail is refetched")
+    parser.add_argument("--concurrency", type=int, default=2, help="Note pages to load at once")
+    parser.add_argument("--headless", action="store_true", help="Run in headless mode")
+    parser.add_argument("--stats", action="store_true", help="Print cache statistics")
+
+    args = parser.parse_args()
+    cache = DetailCache(Path(args.cache), int(args.cache_mb * (1 << 20)), args.ttl)
+    try:
+        if args.input:
+            input_path = Path(args.input)
+            if not input_path.is_absolute():
+                input_path = OUTPUT_DIR / input_path
+            asyncio.run(fetch(input_path, cache, args.concurrency, args.headless))
+        if args.stats or not args.input:
+            stats = cache.stats()
+            print(f"[INFO] {stats['entries']} details ({stats['expired']} expired), "
+                  f"{stats['bytes'] / (1 << 20):.1f}/{stats['max_bytes'] / (1 << 20):.0f} MB")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher
+===============
+Multi-pattern matcher over the category keywords in keywords.json.
+
+Built once, it scans a title in a single pass and returns every matching
+category (in config order) together with the keywords that hit. Up to
+REGEX_MAX_KEYWORDS keywords the scan is one compiled regex, which runs in C
+and beats a per-character loop at the sizes keywords.json ships with;
+larger keyword sets use an Aho-Corasick automaton, whose cost does not grow
+with the number of keywords.
+
+Results are exactly those of the old `keyword in title` loop, including an
+empty keyword, which matches every title.
+"""
+
+import re
+from collections import deque
+
+# Keyword count up to which the regex scan is faster than the automaton
+REGEX_MAX_KEYWORDS = 100
+
+
+class KeywordMatcher:
+    """Multi-pattern matcher built from a {category: [keywords]} mapping."""
+
+    def __init__(self, categories: dict):
+        self.categories = list(categories.keys())
+        self._rank = {cat: i for i, cat in enumerate(self.categories)}
+
+        # Categories of each keyword, so a keyword shared by several
+        # categories (e.g. "路线") reports all of them
+        self._owners = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                owners = self._owners.setdefault(keyword, [])
+                if category not in owners:
+                    owners.append(category)
+        # '' is a substring of every title
+        self._always = self._owners.pop('', [])
+
+        # A scan reports tokens: keywords for the automaton; for the regex,
+        # the longest keyword starting at each position, which stands for
+        # itself and every keyword that is its prefix
+        self._regex = None
+        if len(self._owners) <= REGEX_MAX_KEYWORDS:
+            keywords = sorted(self._owners, key=len, reverse=True)
+            if keywords:
+                self._regex = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+            self._tokens = self._regex_tokens
+            self._token_keywords = {k: [p for p in keywords if k.startswith(p)] for k in keywords}
+        else:
+            # Trie: goto transitions, failure links and per-state outputs
+            self._goto = [{}]
+            self._fail = [0]
+            self._out = [[]]
+            for keyword in self._owners:
+                self._add(keyword)
+            self._build_links()
+            self._tokens = self._scan
+            self._token_keywords = {k: [k] for k in self._owners}
+        self._token_categories = {
+            token: sorted({cat for k in keywords for cat in self._owners[k]}, key=self._rank.__getitem__)
+            for token, keywords in self._token_keywords.items()
+        }
+
+    def _add(self, keyword: str):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(keyword)
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _scan(self, text: str) -> list:
+        """Keywords occurring in `text` (repeats possible)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = []
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.extend(out[state])
+        return found
+
+    def _regex_tokens(self, text: str) -> list:
+        return self._regex.findall(text) if self._regex else []
+
+    def _found(self, title: str) -> list:
+        # A keyword hits if it occurs in the title or in its lowercase form;
+        # the second scan only runs when they differ
+        title_lower = title.lower()
+        tokens = self._tokens(title_lower)
+        if title_lower != title:
+            tokens += self._tokens(title)
+        return tokens
+
+    def match(self, title: str) -> dict:
+        """Return {category: [keywords hit]} for a title, in config order."""
+        hits = {category: [''] for category in self._always}
+        for token in self._found(title):
+            for keyword in self._token_keywords[token]:
+                for category in self._owners[keyword]:
+                    found = hits.setdefault(category, [])
+                    if keyword not in found:
+                        found.append(keyword)
+        return dict(sorted(hits.items(), key=lambda item: self._rank[item[0]]))
+
+    def categorize(self, title: str) -> list:
+        """Return list of matching categories for a note."""
+        tokens = self._found(title)
+        if len(tokens) == 1 and not self._always:
+            return list(self._token_categories[tokens[0]])
+        matched = set(self._always)
+        for token in tokens:
+            matched.update(self._token_categories[token])
+        return sorted(matched, key=self._rank.__getitem__) if matched else ["其他"]
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Note Helpers
+============
+Shared helpers for note records produced by the scraper.
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+NOTE_ID_PATTERN = re.compile(r'/(?:explore|search_result|discovery/item)/([0-9a-zA-Z]+)')
+_SEPARATOR = re.compile(r'[\s,]*')
+COUNT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(万|w|千|k)?', re.IGNORECASE)
+COUNT_UNITS = {'万': 10000, 'w': 10000, '千': 1000, 'k': 1000}
+
+NOTE_FIELDS = ('title', 'author', 'link', 'likes', 'likes_count', 'query', 'note_id')
+ANALYZED_FORMAT = 2
+
+
+class Note:
+    """Compact note record.
+
+    `query` and `author` strings are interned, since a corpus repeats a few
+    queries and authors many times. Fields beyond NOTE_FIELDS go in `extra`.
+    Supports note.get()/note[...] so it can stand in for the scraper's dicts.
+    """
+
+    __slots__ = NOTE_FIELDS + ('extra',)
+
+    def __init__(self, title: str = '', author: str = '', link: str = '', likes: str = '',
+                 likes_count: int = None, query: str = '', note_id: str = None, extra: dict = None):
+        self.title = title
+        self.author = sys.intern(author or '')
+        self.link = link
+        self.likes = likes
+        self.likes_count = likes_count if isinstance(likes_count, int) else parse_count(likes)
+        self.query = sys.intern(query or '')
+        self.note_id = note_id
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, Note):
+            return data
+        extra = {k: v for k, v in data.items() if k not in NOTE_FIELDS}
+        return cls(**{k: data[k] for k in NOTE_FIELDS if k in data}, extra=extra)
+
+    def get(self, key: str, default=None):
+        if key in NOTE_FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self) -> dict:
+        data = {k: getattr(self, k) for k in NOTE_FIELDS if getattr(self, k) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f"Note({self.title!r})"
+
+
+_MISSING = object()
+
+
+def note_key(note: dict) -> str:
+    """Stable identity of a note: note ID (also parsed from its link), else title."""
+    if note.get('note_id'):
+        return note['note_id']
+    link = note.get('link', '')
+    if link:
+        match = NOTE_ID_PATTERN.search(link)
+        return match.group(1) if match else link.split('?', 1)[0]
+    return note.get('title', '')
+
+
+def parse_count(value) -> int:
+    """Parse engagement strings such as "1.2万", "999+", "3k" or "赞" into ints."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = COUNT_PATTERN.search(str(value or '').replace(',', ''))
+    if not match:
+        return 0
+    number, unit = match.groups()
+    return int(round(float(number) * COUNT_UNITS.get((unit or '').lower(), 1)))
+
+
+def normalize_engagement(note: dict) -> dict:
+    """Add an integer `likes_count` next to the raw `likes` string."""
+    if not isinstance(note.get('likes_count'), int):
+        note['likes_count'] = parse_count(note.get('likes'))
+    return note
+
+
+def dedupe_notes(notes) -> list:
+    """Drop repeated notes (by note_key), keeping first occurrence order."""
+    seen = set()
+    unique = []
+    for note in notes:
+        key = note_key(note)
+        if key not in seen:
+            seen.add(key)
+            unique.append(note)
+    return unique
+
+
+def read_notes(path: Path):
+    """Yield notes from a scraper output file (.jsonl stream or .json list)."""
+    if path.suffix == '.jsonl':
+        with path.open(encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line
+                    continue
+    else:
+        yield from iter_json_array(path)
+
+
+def iter_json_array(path: Path, chunk_size: int = 1 << 16):
+    """Yield the items of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with path.open(encoding='utf-8') as f:
+        buf = f.read(chunk_size).lstrip()
+        if not buf.startswith('['):
+            raise ValueError(f"{path} is not a JSON array")
+        pos = 1
+        eof = False
+        
+        while True:
+            pos = _SEPARATOR.match(buf, pos).end()
+            if len(buf) - pos < chunk_size and not eof:
+                # Keep at least one chunk ahead so items rarely straddle the end
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = _SEPARATOR.match(buf, 0).end()
+            if buf.startswith(']', pos):
+                return
+            try:
+                item, pos_end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Item straddles the chunk boundary: read more
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf += chunk
+                continue
+            yield item
+            pos = pos_end
+
+
+def write_analyzed(categorized: dict, path: Path, ranker=None):
+    """Write analyzed output as one note table plus per-category ID lists.
+
+    A note placed in several categories is stored once. With a ranker, each
+    category's IDs are sorted by score (best first).
+    """
+    ids = {}
+    table = []
+    index = {}
+    for cat, items in categorized.items():
+        if ranker:
+            items = sorted(items, key=lambda note: ranker.score(note, cat), reverse=True)
+        cat_ids = []
+        for note in items:
+            note_id = ids.get(id(note))
+            if note_id is None:
+                note_id = ids[id(note)] = len(table)
+                table.append(note)
+            cat_ids.append(note_id)
+        index[cat] = cat_ids
+
+    data = {
+        'format': ANALYZED_FORMAT,
+        'notes': [note.to_dict() if isinstance(note, Note) else note for note in table],
+        'categories': index
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+
+
+def read_analyzed(path: Path) -> dict:
+    """Load analyzed output as {category: [Note]}, sharing one Note per ID.
+
+    Older files (a category -> full note dicts mapping) are still accepted.
+    """
+    data = json.loads(path.read_text(encoding='utf-8'))
+    if data.get('format') == ANALYZED_FORMAT:
+        table = [Note.from_dict(note) for note in data['notes']]
+        return {cat: [table[i] for i in ids] for cat, ids in data['categories'].items()}
+    return {cat: [Note.from_dict(note) for note in items] for cat, items in data.items()}
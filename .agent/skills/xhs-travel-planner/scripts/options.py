@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Scraper Options
+===============
+Flags shared by scraper.py, daemon.py and pipeline.py, defined once so
+their choices and help text stay in step. Kept apart from scraper.py so
+the daemon client and pipeline --input runs can build their parsers
+without patchright.
+"""
+
+from pathlib import Path
+
+from pacing import PACERS
+
+SCRIPT_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPT_DIR.parent
+OUTPUT_DIR = SKILL_DIR / "output"
+
+EXTRACT_MODES = ('batch', 'element', 'capture')
+
+# Lean loads: request kinds that can be aborted, and the default set for --block.
+# 'tracking' matches by host, the rest by Playwright resource type.
+BLOCKABLE_TYPES = ('image', 'media', 'font', 'stylesheet', 'tracking')
+LEAN_BLOCK = ('image', 'media', 'font', 'tracking')
+
+# How a search navigation is considered loaded
+WAIT_MODES = ('networkidle', 'cards')
+
+PACING_MODES = tuple(PACERS)
+
+
+def add_scraper_arguments(parser):
+    """Add the --extract/--rate/--burst/--block/--wait/--pacing flags to `parser`."""
+    parser.add_argument("--extract", choices=EXTRACT_MODES, default='batch',
+                        help="Card extraction: batched DOM evaluation, per-element calls, "
+                             "or decoding the page's search API responses")
+    parser.add_argument("--rate", type=float, default=20,
+                        help="Global budget: page loads/scrolls per minute across all pages")
+    parser.add_argument("--burst", type=int, default=3, help="Rate limiter burst size")
+    parser.add_argument("--block", choices=BLOCKABLE_TYPES, nargs='*',
+                        help="Lean loads: abort these request kinds (bare --block: "
+                             f"{' '.join(LEAN_BLOCK)}); the search API is never blocked")
+    parser.add_argument("--wait", choices=WAIT_MODES,
+                        help="Treat a search page as loaded at network idle or once note cards appear "
+                             "(default: cards with --block, otherwise networkidle)")
+    parser.add_argument("--pacing", choices=PACING_MODES, default='adaptive',
+                        help="Delays: adaptive (speeds up while healthy, backs off on captcha/login/"
+                             "empty/slow pages) or the old fixed random ranges")
+
+
+def scraper_options(args) -> dict:
+    """XHSScraper keyword arguments from the shared --block/--wait/--pacing flags."""
+    block = () if args.block is None else tuple(args.block or LEAN_BLOCK)
+    wait_for = args.wait or ('cards' if block else 'networkidle')
+    return {'block': block, 'wait_for': wait_for, 'pacer': PACERS[args.pacing]()}
+
+
+def output_file(name: str = None):
+    """`name` under output/ unless absolute; None for no name."""
+    if not name:
+        return None
+    path = Path(name)
+    return path if path.is_absolute() else OUTPUT_DIR / path
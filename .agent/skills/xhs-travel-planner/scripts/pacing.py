@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Scrape Pacing
+=============
+Decides how long the scraper waits after page loads, after scrolls and
+between queries, and when it takes a longer rest.
+
+AdaptivePacer shortens its delays while pages come back healthy and backs
+off exponentially on signs of throttling: captcha pages, login redirects,
+pages without cards and slow loads. It remembers the pace that got it into
+trouble and lets that limit decay with the time it has waited since, so a
+few captchas don't hold it back for the rest of the run. A captcha or
+login wall also schedules one cool-down rest that grows with consecutive
+strikes.
+FixedPacer keeps the old fixed random delays (and a 30 s rest per 10
+notes) for comparison.
+
+A simulated server lets the throughput/risk trade-off be explored offline.
+
+Usage:
+    python pacing.py --simulate --pages 400 --tolerance 12
+"""
+
+import math
+import random
+import argparse
+
+# Signals reported by the scraper after each load or scroll
+OK = 'ok'
+EMPTY = 'empty'
+SLOW = 'slow'
+CAPTCHA = 'captcha'
+LOGIN = 'login'
+SIGNALS = (OK, EMPTY, SLOW, CAPTCHA, LOGIN)
+
+# After trouble, stay this much slower than the pace that caused it, and
+# let that limit halve for every this many seconds waited or rested
+MARGIN = 1.5
+LIMIT_HALF_LIFE = 600.0
+
+# Delay per kind relative to the pacer's level (the mean post-scroll delay)
+DELAY_SCALE = {'load': 0.6, 'scroll': 1.0, 'between': 2.0}
+
+
+class AdaptivePacer:
+    """Multiplicative speed-up on healthy pages, exponential back-off on trouble."""
+
+    def __init__(self, level: float = 4.5, floor: float = 1.5, ceiling: float = 60.0,
+                 speedup: float = 0.95, backoff: float = 2.0, slow_seconds: float = 10.0,
+                 rest_seconds: float = 30.0, max_rest_seconds: float = 600.0, rng: random.Random = None):
+        self.level = level
+        self.floor = floor
+        self.ceiling = ceiling
+        self.speedup = speedup
+        self.backoff = backoff
+        self.slow_seconds = slow_seconds
+        self.rest_seconds = rest_seconds
+        self.max_rest_seconds = max_rest_seconds
+        self.rng = rng or random.Random()
+        self.strikes = 0
+        # Level below which trouble was last seen; relaxes with time waited
+        self.limit = floor
+        self._rest = 0.0
+        self._waited = 0.0
+
+    def delay(self, kind: str) -> float:
+        """Seconds to wait after a 'load', 'scroll' or 'between' queries (±25% jitter)."""
+        seconds = self.level * DELAY_SCALE[kind] * self.rng.uniform(0.75, 1.25)
+        self._waited += seconds
+        return seconds
+
+    def record(self, signal: str, notes: int = 0):
+        """Adjust to the outcome of one page load or scroll."""
+        waited, self._waited = self._waited, 0.0
+        if signal == OK:
+            self.strikes = 0
+            self.limit = max(self.floor, self.limit * 0.5 ** (waited / LIMIT_HALF_LIFE))
+            self.level = max(self.limit, self.level * self.speedup)
+            return
+        self.strikes += 1
+        if self.strikes == 1:
+            # Only the pace of the first strike caused trouble; later strikes
+            # come at already backed-off levels and would ratchet the limit
+            self.limit = min(self.ceiling, max(self.limit, self.level * MARGIN))
+        if signal in (CAPTCHA, LOGIN):
+            self.level = min(self.ceiling, self.level * self.backoff ** 2)
+            self._rest = max(self._rest, min(self.max_rest_seconds,
+                                             self.rest_seconds * 2 ** (self.strikes - 1)))
+        else:
+            self.level = min(self.ceiling, self.level * self.backoff)
+            if self.strikes >= 3:
+                # Several soft signals in a row look like throttling too
+                self._rest = max(self._rest, self.rest_seconds)
+
+    def take_rest(self) -> float:
+        """Seconds of rest now due (0 if none); each scheduled rest is taken once."""
+        rest, self._rest = self._rest, 0.0
+        self._waited += rest
+        return rest
+
+
+class FixedPacer:
+    """The original pacing: fixed random ranges and a rest per 10 notes."""
+
+    RANGES = {'load': (2, 4), 'scroll': (3, 6), 'between': (5, 10)}
+
+    def __init__(self, rest_every: int = 10, rest_seconds: float = 30.0, rng: random.Random = None):
+        self.rest_every = rest_every
+        self.rest_seconds = rest_seconds
+        self.rng = rng or random.Random()
+        self.level = sum(self.RANGES['scroll']) / 2
+        self.slow_seconds = math.inf
+        self.notes = 0
+        self._rest = 0.0
+
+    def delay(self, kind: str) -> float:
+        return self.rng.uniform(*self.RANGES[kind])
+
+    def record(self, signal: str, notes: int = 0):
+        # Rest once each time the count passes a multiple of rest_every
+        if (self.notes + notes) // self.rest_every > self.notes // self.rest_every:
+            self._rest = self.rest_seconds
+        self.notes += notes
+
+    def take_rest(self) -> float:
+        rest, self._rest = self._rest, 0.0
+        return rest
+
+
+PACERS = {'adaptive': AdaptivePacer, 'fixed': FixedPacer}
+
+
+class SimulatedServer:
+    """A toy XHS: tolerates `tolerance` requests per minute, then pushes back.
+
+    Above the tolerance, loads slow down, pages come back without cards and
+    captchas appear with rising probability. Each captcha raises a suspicion
+    level that decays while the client stays quiet.
+    """
+
+    def __init__(self, tolerance: float = 12, latency: float = 1.5, suspicion_half_life: float = 120,
+                 rng: random.Random = None):
+        self.tolerance = tolerance
+        self.latency = latency
+        self.suspicion_half_life = suspicion_half_life
+        self.rng = rng or random.Random()
+        self.suspicion = 0.0
+        self._requests = []
+        self._last = 0.0
+
+    def request(self, now: float) -> tuple:
+        """Serve one load/scroll at simulated time `now`; return (signal, seconds)."""
+        self.suspicion *= 0.5 ** ((now - self._last) / self.suspicion_half_life)
+        self._last = now
+        self._requests = [t for t in self._requests if now - t < 60] + [now]
+
+        pressure = max(0.0, len(self._requests) / self.tolerance - 1)
+        seconds = self.latency * self.rng.uniform(0.7, 1.3) * (1 + 4 * pressure)
+        captcha_p = min(0.9, 0.4 * pressure + 0.3 * self.suspicion)
+        if self.rng.random() < captcha_p:
+            self.suspicion += 1
+            return CAPTCHA, seconds
+        if self.rng.random() < min(0.5, pressure):
+            return EMPTY, seconds
+        return OK, seconds
+
+
+def simulate(pacer, server: SimulatedServer, pages: int = 400, notes_per_page: int = 5,
+             pages_per_query: int = 8) -> dict:
+    """Drive `pacer` against `server` on a simulated clock (no real sleeping)."""
+    now = 0.0
+    counts = dict.fromkeys(SIGNALS, 0)
+    rested = 0.0
+    for i in range(pages):
+        if i and i % pages_per_query == 0:
+            now += pacer.delay('between')
+        signal, seconds = server.request(now)
+        now += seconds
+        if signal == OK and seconds > pacer.slow_seconds:
+            signal = SLOW
+        counts[signal] += 1
+        pacer.record(signal, notes_per_page if signal in (OK, SLOW) else 0)
+        now += pacer.delay('load' if i % pages_per_query == 0 else 'scroll')
+        rest = pacer.take_rest()
+        rested += rest
+        now += rest
+
+    minutes = now / 60
+    useful = counts[OK] + counts[SLOW]
+    return {
+        'pages': pages,
+        'useful_pages': useful,
+        'minutes': round(minutes, 1),
+        'useful_pages_per_minute': round(useful / minutes, 2) if minutes else 0.0,
+        'captchas': counts[CAPTCHA],
+        'empty': counts[EMPTY],
+        'slow': counts[SLOW],
+        'rest_minutes': round(rested / 60, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Pacing")
+    parser.add_argument("--simulate", action="store_true", required=True,
+                        help="Compare pacers against the simulated server")
+    parser.add_argument("--pages", type=int, default=400, help="Loads/scrolls per run")
+    parser.add_argument("--tolerance", type=float, nargs='+', default=[8, 12, 20],
+                        help="Server tolerance(s) in requests per minute")
+    parser.add_argument("--seeds", type=int, default=5,
+                        help="Runs per setting; pages/min is total useful pages over total minutes")
+
+    args = parser.parse_args()
+
+    print("=== 节奏模拟 ===")
+    print(f"  {'tolerance':>9} {'pacer':<9} {'pages/min':>9} {'captchas':>8} {'empty':>6} {'minutes':>8}")
+    for tolerance in args.tolerance:
+        for name, pacer_cls in PACERS.items():
+            runs = [
+                simulate(pacer_cls(rng=random.Random(seed)),
+                         SimulatedServer(tolerance, rng=random.Random(seed + 1000)), args.pages)
+                for seed in range(args.seeds)
+            ]
+            mean = {key: sum(run[key] for run in runs) / len(runs)
+                    for key in ('useful_pages', 'captchas', 'empty', 'minutes')}
+            # Rate over the pooled runs, so one slow seed isn't hidden by fast ones
+            rate = mean['useful_pages'] / mean['minutes'] if mean['minutes'] else 0.0
+            print(f"  {tolerance:>9g} {name:<9} {rate:>9.2f} "
+                  f"{mean['captchas']:>8.1f} {mean['empty']:>6.1f} {mean['minutes']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+XHS Travel Pipeline
+===================
+Scrape, analyze and render a destination in one process, passing notes in
+memory between stages. Intermediate JSON is only written on request, and
+wall-clock time and item counts are reported per stage.
+
+Usage:
+    python pipeline.py --destination "黄山" --limit 30
+    python pipeline.py --destination "黄山" --input xhs_results.jsonl   # skip scraping
+    python pipeline.py --destination "黄山" --save-intermediate --timings timings.json
+    python pipeline.py --destination "黄山" --daemon                  # scrape via daemon.py
+    python pipeline.py --destination "黄山" --details                 # categorize on note bodies too
+"""
+
+import asyncio
+import json
+import time
+import argparse
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from analyzer import analyze_notes, load_keywords, load_matcher, write_output
+from dedup import DEFAULT_THRESHOLD
+from detail import DETAILS_FILE, DetailCache, attach_details
+from notes import read_notes
+from options import add_scraper_arguments, output_file, scraper_options
+from ranking import Ranker
+from scoring import CategoryScorer
+from visualizer import build_viewer_index, generate_mindmap, iter_markdown_report, save_outputs
+
+SCRIPT_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPT_DIR.parent
+OUTPUT_DIR = SKILL_DIR / "output"
+
+
+class StageTimer:
+    """Collects (stage, seconds, items) rows."""
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name: str):
+        row = {'stage': name, 'seconds': 0.0, 'items': 0}
+        start = time.perf_counter()
+        try:
+            yield row
+        finally:
+            row['seconds'] = round(time.perf_counter() - start, 3)
+            self.stages.append(row)
+
+    def report(self):
+        total = sum(row['seconds'] for row in self.stages)
+        print("\n=== 阶段耗时 ===")
+        for row in self.stages:
+            share = row['seconds'] / total * 100 if total else 0
+            print(f"  {row['stage']:<14} {row['seconds']:>9.3f}s {share:>5.1f}%  {row['items']} items")
+        print(f"  {'total':<14} {total:>9.3f}s")
+
+
+async def scrape_via_daemon(destination: str, limit: int, timer: StageTimer, address: str) -> list:
+    from daemon import fetch
+
+    host, _, port = address.rpartition(':')
+    with timer.stage('scrape') as row:
+        notes, final = await fetch(
+            {'op': 'destination', 'destination': destination, 'limit_per_query': limit // 6},
+            host or '127.0.0.1', int(port)
+        )
+        row['items'] = len(notes)
+    if final.get('blocked'):
+        print(f"[WARN] No notes (login wall/captcha?) for: {', '.join(final['blocked'])}")
+    return notes
+
+
+async def scrape(destination: str, limit: int, timer: StageTimer, args) -> list:
+    # Imported here so --input runs work without patchright installed
+    from ratelimit import TokenBucket
+    from scraper import XHSScraper
+    from telemetry import Telemetry
+
+    telemetry = Telemetry(output_file(args.trace), output_file(args.metrics))
+    scraper = XHSScraper(extract_mode=args.extract, limiter=TokenBucket(args.rate, args.burst),
+                         telemetry=telemetry, **scraper_options(args))
+    try:
+        with timer.stage('startup'):
+            await scraper.start(headless=args.headless)
+        with timer.stage('scrape') as row:
+            notes = await scraper.search_multiple(
+                destination,
+                limit_per_query=limit // 6,
+                concurrency=args.concurrency
+            )
+            row['items'] = len(notes)
+        if args.details:
+            with timer.stage('details') as row:
+                cache = DetailCache(Path(args.details))
+                try:
+                    row['items'] = await scraper.fetch_details(notes, cache, max(1, args.concurrency))
+                finally:
+                    cache.close()
+    finally:
+        with timer.stage('shutdown'):
+            await scraper.close()
+    return notes
+
+
+async def run_pipeline(args) -> dict:
+    timer = StageTimer()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    if args.input:
+        input_path = Path(args.input)
+        if not input_path.is_absolute():
+            input_path = OUTPUT_DIR / input_path
+        with timer.stage('load') as row:
+            notes = list(read_notes(input_path))
+            row['items'] = len(notes)
+    else:
+        if args.daemon:
+            notes = await scrape_via_daemon(args.destination, args.limit, timer, args.daemon)
+        else:
+            notes = await scrape(args.destination, args.limit, timer, args)
+        if args.save_intermediate:
+            with timer.stage('save-raw') as row:
+                OUTPUT_DIR.mkdir(exist_ok=True)
+                raw_file = OUTPUT_DIR / f"xhs_results_{timestamp}.json"
+                raw_file.write_text(json.dumps(notes, ensure_ascii=False), encoding='utf-8')
+                row['items'] = len(notes)
+
+    if args.details:
+        with timer.stage('attach-details') as row:
+            cache = DetailCache(Path(args.details))
+            try:
+                notes = list(attach_details(notes, cache))
+            finally:
+                cache.close()
+            row['items'] = sum(1 for note in notes if note.get('desc'))
+
+    with timer.stage('analyze') as row:
+        categories = load_keywords()
+        scorer = CategoryScorer.from_config(categories) if args.scoring else None
+        categorized = analyze_notes(notes, categories, load_matcher(categories), args.dedup_threshold, scorer)
+        row['items'] = sum(len(items) for items in categorized.values())
+
+    if args.save_intermediate:
+        with timer.stage('save-analyzed') as row:
+            write_output(categorized, OUTPUT_DIR / "analyzed.json")
+            row['items'] = len({id(n) for items in categorized.values() for n in items})
+
+    with timer.stage('render') as row:
+        ranker = Ranker.from_config()
+        mindmap = generate_mindmap(categorized, args.destination, ranker)
+        viewer = None if args.no_viewer else build_viewer_index(categorized, args.destination, ranker)
+        row['items'] = sum(1 for items in categorized.values() if items)
+
+    # The report is generated while it is written, one category at a time
+    with timer.stage('write') as row:
+        report = iter_markdown_report(categorized, args.destination, mindmap, ranker)
+        save_outputs(mindmap, report, args.destination, viewer)
+        row['items'] = 2 if viewer is None else 3
+
+    timer.report()
+    if args.timings:
+        timings_file = output_file(args.timings)
+        timings_file.parent.mkdir(parents=True, exist_ok=True)
+        timings_file.write_text(json.dumps({
+            'destination': args.destination,
+            'started_at': timestamp,
+            'stages': timer.stages
+        }, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"[INFO] Timings saved to {timings_file}")
+
+    return categorized
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XHS Travel Pipeline")
+    parser.add_argument("--destination", type=str, required=True, help="Destination to plan")
+    parser.add_argument("--limit", type=int, default=30, help="Max notes to scrape")
+    parser.add_argument("--input", type=str, help="Use an existing result file instead of scraping")
+    parser.add_argument("--daemon", type=str, nargs='?', const="127.0.0.1:8765",
+                        help="Scrape through a running daemon.py (HOST:PORT) instead of launching a browser")
+    parser.add_argument("--details", type=str, nargs='?', const=str(DETAILS_FILE),
+                        help="Fetch note bodies/tags (cached in output/details.db) and categorize on them")
+    parser.add_argument("--headless", action="store_true", help="Run in headless mode")
+    add_scraper_arguments(parser)
+    parser.add_argument("--concurrency", type=int, default=1, help="Pages to search on at once")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Near-duplicate title similarity (0 disables)")
+    parser.add_argument("--scoring", action="store_true",
+                        help="Assign categories by weighted keyword scores (see scoring.py)")
+    parser.add_argument("--no-viewer", action="store_true", help="Skip the HTML viewer")
+    parser.add_argument("--save-intermediate", action="store_true",
+                        help="Also write the raw results and analyzed.json")
+    parser.add_argument("--timings", type=str, help="Write per-stage timings to this JSON file")
+    parser.add_argument("--trace", type=str, help="Append scraper events to this JSONL file")
+    parser.add_argument("--metrics", type=str, help="Write scraper metrics as a Prometheus textfile")
+
+    args = parser.parse_args()
+    if args.daemon and args.details and not args.input:
+        # The daemon only searches; fetching details would need a browser here
+        parser.error("--details fetches with a local browser and can't be combined with --daemon; "
+                     "fetch afterwards with detail.py --input <results>, or drop --daemon")
+    try:
+        asyncio.run(run_pipeline(args))
+    except ConnectionError as e:
+        print(f"[ERROR] {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
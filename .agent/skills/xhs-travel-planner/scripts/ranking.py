@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Note Ranking
+============
+Scores notes by a configurable mix of engagement, recency and keyword-match
+strength, and picks the top k per category with a heap (O(n log k)).
+
+Recency is measured from a note's publish time (`time`, from the search API
+or the detail page). Scrape times say nothing about a note's age, so notes
+without a publish time get a neutral recency score.
+
+Weights live under "ranking" in references/keywords.json.
+"""
+
+import heapq
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+
+from matcher import KeywordMatcher
+from notes import parse_count
+
+SCRIPT_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPT_DIR.parent
+KEYWORDS_FILE = SKILL_DIR / "references" / "keywords.json"
+
+DEFAULT_WEIGHTS = {"likes": 1.0, "recency": 0.3, "match": 0.5}
+DEFAULT_HALF_LIFE_DAYS = 30
+
+# likes_count at which the engagement feature reaches 1.0 (log scale)
+LIKES_SCALE = 100000
+# keyword hits at which the match feature reaches 1.0
+MATCH_SCALE = 3
+# Recency of a note whose publish time is unknown: that of one half-life
+NEUTRAL_RECENCY = 0.5
+
+
+def load_ranking_config() -> tuple:
+    """Return (categories, ranking config) from keywords.json."""
+    if KEYWORDS_FILE.exists():
+        config = json.loads(KEYWORDS_FILE.read_text(encoding='utf-8'))
+        return config.get('categories', {}), config.get('ranking', {})
+    return {}, {}
+
+
+def _published(note: dict):
+    """Publish time of a note as a naive local datetime, or None."""
+    value = note.get('time')
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        # API timestamps are in milliseconds
+        return datetime.fromtimestamp(value / 1000 if value > 1e11 else value)
+    try:
+        ts = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return ts.astimezone().replace(tzinfo=None) if ts.tzinfo else ts
+
+
+class Ranker:
+    """Scores notes; higher is better."""
+
+    def __init__(self, weights: dict = None, matcher: KeywordMatcher = None,
+                 half_life_days: float = DEFAULT_HALF_LIFE_DAYS, now: datetime = None):
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.matcher = matcher
+        self.half_life_days = half_life_days
+        self.now = now or datetime.now()
+
+    @classmethod
+    def from_config(cls, now: datetime = None):
+        categories, ranking = load_ranking_config()
+        return cls(
+            weights=ranking.get('weights'),
+            matcher=KeywordMatcher(categories) if categories else None,
+            half_life_days=ranking.get('half_life_days', DEFAULT_HALF_LIFE_DAYS),
+            now=now
+        )
+
+    def features(self, note: dict, category: str = None, hits: dict = None) -> dict:
+        """Each feature is scaled to roughly [0, 1]; `hits` reuses a matcher.match of the title."""
+        likes = note.get('likes_count')
+        if not isinstance(likes, int):
+            likes = parse_count(note.get('likes'))
+        features = {"likes": min(1.0, math.log1p(likes) / math.log1p(LIKES_SCALE))}
+
+        ts = _published(note)
+        if ts is None:
+            features["recency"] = NEUTRAL_RECENCY
+        else:
+            age_days = max(0.0, (self.now - ts).total_seconds() / 86400)
+            features["recency"] = 0.5 ** (age_days / self.half_life_days)
+
+        if self.matcher:
+            if hits is None:
+                hits = self.matcher.match(note.get('title', ''))
+            count = len(hits.get(category, [])) if category else sum(map(len, hits.values()))
+            features["match"] = min(1.0, count / MATCH_SCALE)
+        else:
+            features["match"] = 0.0
+        return features
+
+    def score(self, note: dict, category: str = None) -> float:
+        features = self.features(note, category)
+        return sum(self.weights.get(name, 0.0) * value for name, value in features.items())
+
+    def top_k(self, notes, k: int, category: str = None) -> list:
+        """Best k notes, highest score first; ties keep input order."""
+        return heapq.nlargest(k, notes, key=lambda note: self.score(note, category))
+
+    def rank(self, categorized: dict) -> dict:
+        """Every category's notes, highest score first; ties keep input order.
+
+        Each title is matched once, however many categories it is in.
+        """
+        hits = {}
+
+        def score(note, category):
+            if self.matcher and id(note) not in hits:
+                hits[id(note)] = self.matcher.match(note.get('title', ''))
+            features = self.features(note, category, hits.get(id(note)))
+            return sum(self.weights.get(name, 0.0) * value for name, value in features.items())
+
+        return {cat: sorted(notes, key=lambda note: score(note, cat), reverse=True)
+                for cat, notes in categorized.items()}
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Global Rate Limiter
+===================
+Token bucket shared by every page of a scraper, so concurrent searches stay
+within one request budget.
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per minute, bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available, then take it."""
+        # The lock keeps waiters in FIFO order so no page starves
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Weighted Category Scoring
+=========================
+Scores how strongly each note belongs to each category, instead of the flat
+"any keyword hit" rule of categorize_note.
+
+For a batch of notes a sparse note x keyword hit matrix (log2(1 + hits),
+so one hit counts 1.0) is multiplied by a keyword x category weight matrix
+in one step.
+A keyword listed under several categories splits its weight between them
+unless "scoring.weights" in references/keywords.json says otherwise. Each
+note gets per-category scores, confidences (its share of the note's total
+score), the categories that clear both thresholds and a primary category.
+
+NumPy and SciPy are optional: without them the same scores are computed by
+a per-note Python loop.
+
+Usage:
+    python scoring.py --input xhs_results.jsonl --top 20
+"""
+
+import re
+import json
+import math
+import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+SCRIPT_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPT_DIR.parent
+KEYWORDS_FILE = SKILL_DIR / "references" / "keywords.json"
+OUTPUT_DIR = SKILL_DIR / "output"
+
+OTHER = "其他"
+DEFAULT_MIN_SCORE = 0.5
+DEFAULT_MIN_SHARE = 0.2
+# Separates notes in the joined corpus; never part of a keyword
+_JOIN = "\x00"
+
+
+class CategoryScorer:
+    """Keyword x category weights plus assignment thresholds."""
+
+    def __init__(self, categories: dict, weights: dict = None,
+                 min_score: float = DEFAULT_MIN_SCORE, min_share: float = DEFAULT_MIN_SHARE):
+        self.categories = list(categories)
+        self.keywords = list(dict.fromkeys(kw for kws in categories.values() for kw in kws if kw))
+        self.min_score = min_score
+        self.min_share = min_share
+
+        owners = {kw: [cat for cat, kws in categories.items() if kw in kws] for kw in self.keywords}
+        # weights[k][c]: default 1 / (number of categories listing the keyword)
+        self.weights = [
+            [1.0 / len(owners[kw]) if cat in owners[kw] else 0.0 for cat in self.categories]
+            for kw in self.keywords
+        ]
+        col = {cat: j for j, cat in enumerate(self.categories)}
+        row = {kw: i for i, kw in enumerate(self.keywords)}
+        for cat, overrides in (weights or {}).items():
+            for kw, weight in overrides.items():
+                if cat in col and kw in row:
+                    self.weights[row[kw]][col[cat]] = float(weight)
+
+    @classmethod
+    def from_config(cls, categories: dict = None):
+        config = json.loads(KEYWORDS_FILE.read_text(encoding='utf-8')) if KEYWORDS_FILE.exists() else {}
+        scoring = config.get('scoring', {})
+        return cls(
+            categories if categories is not None else config.get('categories', {}),
+            weights=scoring.get('weights'),
+            min_score=scoring.get('min_score', DEFAULT_MIN_SCORE),
+            min_share=scoring.get('min_share', DEFAULT_MIN_SHARE)
+        )
+
+    def config(self) -> dict:
+        """Everything assignments depend on (for cache fingerprints)."""
+        return {'categories': self.categories, 'keywords': self.keywords, 'weights': self.weights,
+                'min_score': self.min_score, 'min_share': self.min_share}
+
+    def _hits_sparse(self, texts: list):
+        """CSR matrix of keyword occurrence counts, one row per text.
+
+        Each keyword is found with one C-level regex pass over all texts
+        joined together; match offsets map back to rows by binary search.
+        Lowercase keywords are searched in the lowercased texts and others
+        in the originals, the same either-form rule as KeywordMatcher.
+        """
+        rows, cols = [], []
+        corpora = {}
+        for lower in (True, False):
+            parts = [t.lower() for t in texts] if lower else texts
+            lengths = np.fromiter((len(t) + 1 for t in parts), dtype=np.int64, count=len(parts))
+            corpora[lower] = (_JOIN.join(parts), np.cumsum(lengths))
+        for k, keyword in enumerate(self.keywords):
+            corpus, ends = corpora[keyword == keyword.lower()]
+            starts = np.fromiter((m.start() for m in re.finditer(re.escape(keyword), corpus)), dtype=np.int64)
+            if starts.size:
+                rows.append(np.searchsorted(ends, starts, side='right'))
+                cols.append(np.full(starts.size, k, dtype=np.int64))
+        shape = (len(texts), len(self.keywords))
+        if not rows:
+            return sparse.csr_matrix(shape, dtype=np.float64)
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        # Duplicate (row, col) pairs are summed into counts
+        return sparse.csr_matrix((np.ones(rows.size), (rows, cols)), shape=shape)
+
+    def score(self, texts: list):
+        """Per-category scores, one row per text (columns follow self.categories).
+
+        An ndarray with NumPy/SciPy installed, else a list of lists.
+        """
+        if sparse is None:
+            return [self._score_one(text) for text in texts]
+        if not texts:
+            return np.zeros((0, len(self.categories)))
+        hits = self._hits_sparse(texts).log1p() / math.log(2)
+        return np.asarray(hits @ np.asarray(self.weights))
+
+    def _score_one(self, text: str) -> list:
+        lower = text.lower()
+        scores = [0.0] * len(self.categories)
+        for keyword, weights in zip(self.keywords, self.weights):
+            count = (lower if keyword == keyword.lower() else text).count(keyword)
+            if count:
+                tf = math.log2(1 + count)
+                for j, weight in enumerate(weights):
+                    scores[j] += tf * weight
+        return scores
+
+    def assign(self, texts: list) -> list:
+        """(categories, primary, confidences) per text.
+
+        A category is kept when its score reaches min_score and its share
+        of the note's total reaches min_share. A note with keyword hits but
+        no category over both thresholds keeps its best-scoring one, so no
+        note the flat matcher places is lost; notes without hits go to 其他.
+        Confidences only list categories with a non-zero score.
+        """
+        scores = self.score(texts)
+        if sparse is None:
+            return [self._assign_one(row) for row in scores]
+
+        total = scores.sum(axis=1)
+        shares = np.divide(scores, total[:, None], out=np.zeros_like(scores), where=total[:, None] > 0)
+        kept = (scores >= self.min_score) & (shares >= self.min_share)
+        best = scores.argmax(axis=1)
+        has_primary = total > 0
+
+        categories = self.categories
+        results = []
+        for row_kept, row_shares, row_best, row_primary in zip(
+                kept.tolist(), shares.round(3).tolist(), best.tolist(), has_primary.tolist()):
+            primary = categories[row_best] if row_primary else OTHER
+            cats = [cat for cat, keep in zip(categories, row_kept) if keep] or [primary]
+            confidences = {cat: share for cat, share in zip(categories, row_shares) if share > 0}
+            results.append((cats, primary, confidences))
+        return results
+
+    def _assign_one(self, scores: list) -> tuple:
+        total = sum(scores)
+        if total <= 0:
+            return [OTHER], OTHER, {}
+        confidences = {cat: round(s / total, 3) for cat, s in zip(self.categories, scores) if s > 0}
+        kept = [cat for cat, s in zip(self.categories, scores)
+                if s >= self.min_score and s / total >= self.min_share]
+        primary = self.categories[max(range(len(scores)), key=scores.__getitem__)]
+        return kept or [primary], primary, confidences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weighted Category Scoring")
+    parser.add_argument("--input", type=str, required=True, help="Scraper result file to score")
+    parser.add_argument("--top", type=int, default=10, help="Notes to print")
+
+    args = parser.parse_args()
+    from analyzer import note_text
+    from notes import read_notes
+
+    input_path = Path(args.input)
+    if not input_path.is_absolute():
+        input_path = OUTPUT_DIR / input_path
+    notes = list(read_notes(input_path))
+    scorer = CategoryScorer.from_config()
+    results = scorer.assign([note_text(note) for note in notes])
+
+    primary_counts = {}
+    for _, primary, _ in results:
+        primary_counts[primary] = primary_counts.get(primary, 0) + 1
+    print("=== 主分类统计 ===")
+    for cat in scorer.categories + [OTHER]:
+        if primary_counts.get(cat):
+            print(f"  {cat}: {primary_counts[cat]} 篇")
+    print()
+    for note, (cats, primary, confidences) in list(zip(notes, results))[:args.top]:
+        shares = " ".join(f"{cat}:{conf:.2f}" for cat, conf in confidences.items())
+        print(f"  [{primary}] {note.get('title', '')[:30]}  ({shares})")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,12 @@ Scrapes travel-related notes from Xiaohongshu with anti-detection measures.
 Usage:
     python scraper.py --login                    # First-time login (saves cookies)
     python scraper.py --query "黄山" --limit 30  # Search and scrape
+    python scraper.py --destination "黄山" --resume  # Continue an interrupted run
+    python scraper.py --fixture page.html        # Extract cards from a saved page
+    python scraper.py --query "黄山" --extract capture --capture-dir output/capture
+    python scraper.py --destination "黄山" --trace trace.jsonl --metrics xhs.prom
+    python scraper.py --destination "黄山" --block               # Lean loads: no media/fonts/trackers
+    python scraper.py --destination "黄山" --details             # Also fetch note bodies and tags
 """
 
 import asyncio
@@ -14,16 +20,28 @@ import json
 import random
 import sys
 import os
+import time
 import argparse
 from pathlib import Path
 from datetime import datetime
 
 try:
     from patchright.async_api import async_playwright
+    from patchright.async_api import TimeoutError as PlaywrightTimeoutError
 except ImportError:
     print("Error: pip install patchright")
     sys.exit(1)
 
+from capture import decode_search_payload, is_search_response
+from detail import DETAILS_FILE, EXTRACT_DETAIL_JS, DetailCache, decode_detail
+from notes import dedupe_notes, note_key, parse_count, read_notes
+from options import (BLOCKABLE_TYPES, EXTRACT_MODES, WAIT_MODES, add_scraper_arguments, output_file,
+                     scraper_options)
+from pacing import EMPTY, OK, SLOW, AdaptivePacer
+from ratelimit import TokenBucket
+from store import STORE_FILE, NoteStore
+from telemetry import Telemetry
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 SKILL_DIR = SCRIPT_DIR.parent
@@ -35,14 +53,107 @@ KEYWORDS_FILE = SKILL_DIR / "references" / "keywords.json"
 XHS_URL = "https://www.xiaohongshu.com"
 XHS_SEARCH_URL = "https://www.xiaohongshu.com/search_result"
 
+# Card selectors (shared by both extraction modes)
+CARD_SELECTOR = 'section.note-item, div[data-v-a264b01a].note-item, .feeds-page .note-item'
+CARD_FALLBACK_SELECTOR = '[class*="note"]'
+TITLE_SELECTOR = '.title, span.title, [class*="title"]'
+AUTHOR_SELECTOR = '.author, .name, [class*="author"], [class*="name"]'
+LIKES_SELECTOR = '[class*="like"], [class*="count"]'
+
+# Hosts aborted by --block tracking
+TRACKING_HOSTS = (
+    'apm-fe.xiaohongshu.com', 'apm-web.xiaohongshu.com', 't2.xiaohongshu.com',
+    'spltest.xiaohongshu.com', 'lng.xiaohongshu.com',
+    'google-analytics.com', 'googletagmanager.com', 'hm.baidu.com', 'sentry.io'
+)
+CARD_WAIT_TIMEOUT = 15000
+# Scrolls in a row without a new note before a query counts as exhausted
+STALE_SCROLLS = 2
+
+# Pulls every visible card's fields in one in-page evaluation
+EXTRACT_CARDS_JS = """
+(sel) => {
+    let cards = document.querySelectorAll(sel.card);
+    if (!cards.length) cards = document.querySelectorAll(sel.fallback);
+    const text = (card, s) => {
+        const el = card.querySelector(s);
+        return el ? el.innerText : null;
+    };
+    return Array.from(cards, (card) => {
+        const a = card.querySelector('a');
+        return {
+            title: text(card, sel.title) || '',
+            author: text(card, sel.author) || '',
+            link: (a && a.getAttribute('href')) || '',
+            likes: text(card, sel.likes) || '0',
+        };
+    });
+}
+"""
+
+
+def _blocked_reason(url: str):
+    """'captcha' or 'login' when XHS redirected away from the results, else None."""
+    url = url.lower()
+    # The captcha page lives under /website-login/, so check it first
+    if 'captcha' in url or 'verify' in url:
+        return 'captcha'
+    if 'login' in url:
+        return 'login'
+    return None
+
+
+def _request_kind(resource_type: str, url: str) -> str:
+    """Blockable kind of a request: 'tracking' for analytics hosts, else its resource type."""
+    host = url.split('/', 3)[2] if '://' in url else ''
+    if any(host == h or host.endswith('.' + h) for h in TRACKING_HOSTS):
+        return 'tracking'
+    return resource_type
+
+
+def _normalize_link(link: str) -> str:
+    """Make relative note links absolute."""
+    if link and not link.startswith('http'):
+        link = f"{XHS_URL}{link}"
+    return link
+
 
 class XHSScraper:
-    def __init__(self):
+    def __init__(self, extract_mode: str = 'batch', capture_dir: Path = None,
+                 limiter: TokenBucket = None, store: NoteStore = None, telemetry: Telemetry = None,
+                 block: tuple = (), wait_for: str = 'networkidle', retain: bool = True, pacer=None):
+        if extract_mode not in EXTRACT_MODES:
+            raise ValueError(f"Unknown extract mode: {extract_mode}")
+        if wait_for not in WAIT_MODES:
+            raise ValueError(f"Unknown wait mode: {wait_for}")
+        unknown = set(block) - set(BLOCKABLE_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown resource types to block: {', '.join(sorted(unknown))}")
         self.pw = None
         self.browser = None
         self.context = None
         self.page = None
         self.results = []
+        self.extract_mode = extract_mode
+        self.capture_dir = capture_dir
+        self.limiter = limiter
+        self.store = store
+        self.telemetry = telemetry or Telemetry()
+        self.block = frozenset(block)
+        self.wait_for = wait_for
+        # False for long-lived use (daemon.py): collected notes and finished
+        # queries are not remembered between searches
+        self.retain = retain
+        # Shared by all pages, so trouble on one tab slows them all
+        self.pacer = pacer or AdaptivePacer()
+        self._captured = {}
+        self._capture_count = 0
+        self._result_keys = set()
+        self.stream_path = None
+        self.checkpoint_path = None
+        self.target = None
+        self._stream = None
+        self._completed = {}
 
     async def start(self, headless=False):
         """Launch browser with stealth settings."""
@@ -69,20 +180,31 @@ class XHSScraper:
             await self.context.add_cookies(cookies)
             print(f"[INFO] Loaded cookies from {COOKIES_FILE}")
         
+        if self.block:
+            await self.context.route("**/*", self._route)
+            print(f"[INFO] Blocking requests: {', '.join(sorted(self.block))}")
+        
         self.page = await self.context.new_page()
         return self
 
     async def close(self):
         """Close browser and save cookies."""
+        self._close_stream()
+        if self.store:
+            self.store.close()
+        self.telemetry.close()
         if self.context:
-            cookies = await self.context.cookies()
-            COOKIES_FILE.write_text(json.dumps(cookies, ensure_ascii=False, indent=2), encoding='utf-8')
-            print(f"[INFO] Cookies saved to {COOKIES_FILE}")
+            await self.save_cookies()
         if self.browser:
             await self.browser.close()
         if self.pw:
             await self.pw.stop()
 
+    async def save_cookies(self):
+        cookies = await self.context.cookies()
+        COOKIES_FILE.write_text(json.dumps(cookies, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"[INFO] Cookies saved to {COOKIES_FILE}")
+
     async def login(self):
         """Open XHS for manual login."""
         print("[INFO] Opening XHS for login...")
@@ -97,123 +219,468 @@ class XHSScraper:
         await asyncio.sleep(2)
         print("[INFO] Login saved. You can now run searches.")
 
-    async def _random_delay(self, min_sec=3, max_sec=8):
-        """Human-like random delay."""
-        delay = random.uniform(min_sec, max_sec)
-        await asyncio.sleep(delay)
+    async def _route(self, route):
+        """Abort requests of a blocked kind; the search API is always let through."""
+        request = route.request
+        kind = _request_kind(request.resource_type, request.url)
+        if kind in self.block and not is_search_response(request.url):
+            self.telemetry.count('requests_blocked_total', kind=kind)
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _goto_search(self, page, url: str, query: str):
+        """Navigate to a results page and wait until cards are usable.
+
+        'networkidle' waits for the whole page to settle; 'cards' returns
+        once the DOM is parsed and the first note card is attached. Either
+        way time-to-first-card is recorded (for 'networkidle' it is the
+        full load, since cards are only looked at afterwards) and returned;
+        None means no card showed up.
+        """
+        start = time.perf_counter()
+        with self.telemetry.timed('goto_seconds') as fields:
+            fields['query'] = query
+            if self.wait_for == 'networkidle':
+                await page.goto(url, wait_until='networkidle', timeout=30000)
+            else:
+                await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        
+        if self.wait_for == 'cards':
+            try:
+                await page.wait_for_selector(CARD_SELECTOR, state='attached', timeout=CARD_WAIT_TIMEOUT)
+            except PlaywrightTimeoutError:
+                # No cards (empty results, login wall, captcha): the caller checks
+                return None
+        elif not await page.query_selector(CARD_SELECTOR):
+            return None
+        
+        seconds = time.perf_counter() - start
+        self.telemetry.observe('first_card_seconds', seconds, wait=self.wait_for)
+        self.telemetry.event('first_card', query=query, wait=self.wait_for, seconds=round(seconds, 3))
+        return seconds
+
+    async def _sleep(self, seconds: float, kind: str):
+        """Sleep, accounting the time to `kind` (delay, rest, scroll, between...)."""
+        self.telemetry.observe('sleep_seconds', seconds, kind=kind)
+        await asyncio.sleep(seconds)
+
+    async def _pace(self, kind: str):
+        """Wait as long as the pacer asks after a 'load', a 'scroll' or 'between' queries."""
+        await self._sleep(self.pacer.delay(kind), 'delay' if kind != 'between' else kind)
+        rest = self.pacer.take_rest()
+        if rest:
+            print(f"[INFO] Resting for {rest:.0f} seconds to avoid detection...")
+            await self._sleep(rest, 'rest')
+
+    def _signal(self, signal: str, query: str, notes: int = 0):
+        """Report how a load or scroll went to the pacer."""
+        self.pacer.record(signal, notes)
+        self.telemetry.count('pace_signals_total', signal=signal)
+        if signal != OK:
+            self.telemetry.event('pace', query=query, signal=signal, level=round(self.pacer.level, 2))
 
-    async def _scroll_page(self):
+    async def _throttle(self):
+        """Take a token from the shared rate limiter, if one is configured."""
+        if self.limiter:
+            start = time.perf_counter()
+            await self.limiter.acquire()
+            self.telemetry.observe('throttle_seconds', time.perf_counter() - start)
+
+    async def _scroll_page(self, page):
         """Simulate human scrolling."""
+        await self._throttle()
         for _ in range(random.randint(2, 4)):
-            await self.page.evaluate(f"window.scrollBy(0, {random.randint(300, 600)})")
-            await asyncio.sleep(random.uniform(0.5, 1.5))
+            await page.evaluate(f"window.scrollBy(0, {random.randint(300, 600)})")
+            await self._sleep(random.uniform(0.5, 1.5), 'scroll')
+
+    def _capture_handler(self, page):
+        """Build a response listener that buffers search API payloads for `page`."""
+        async def on_response(response):
+            if not is_search_response(response.url):
+                return
+            try:
+                payload = await response.json()
+            except Exception:
+                return
+            self._captured.setdefault(page, []).append(payload)
+            
+            if self.capture_dir:
+                self.capture_dir.mkdir(parents=True, exist_ok=True)
+                self._capture_count += 1
+                body_file = self.capture_dir / f"response_{self._capture_count:04d}.json"
+                body_file.write_text(json.dumps(payload, ensure_ascii=False), encoding='utf-8')
+        return on_response
 
-    async def search(self, query: str, limit: int = 30):
-        """Search XHS and extract note cards."""
+    async def _extract_cards(self, page):
+        """Return raw {title, author, link, likes} records for visible cards."""
+        if self.extract_mode == 'capture':
+            payloads = self._captured.pop(page, [])
+            return [record for payload in payloads for record in decode_search_payload(payload)]
+        if self.extract_mode == 'batch':
+            return await page.evaluate(EXTRACT_CARDS_JS, {
+                'card': CARD_SELECTOR,
+                'fallback': CARD_FALLBACK_SELECTOR,
+                'title': TITLE_SELECTOR,
+                'author': AUTHOR_SELECTOR,
+                'likes': LIKES_SELECTOR,
+            })
+        return await self._extract_cards_by_element(page)
+
+    async def _extract_cards_by_element(self, page):
+        """Legacy extraction: one round trip per card field."""
+        cards = await page.query_selector_all(CARD_SELECTOR)
+        
+        if not cards:
+            # Try alternative selectors
+            cards = await page.query_selector_all(CARD_FALLBACK_SELECTOR)
+        
+        records = []
+        for card in cards:
+            try:
+                title_el = await card.query_selector(TITLE_SELECTOR)
+                author_el = await card.query_selector(AUTHOR_SELECTOR)
+                link_el = await card.query_selector('a')
+                likes_el = await card.query_selector(LIKES_SELECTOR)
+                records.append({
+                    'title': await title_el.inner_text() if title_el else "",
+                    'author': await author_el.inner_text() if author_el else "",
+                    'link': (await link_el.get_attribute('href') if link_el else "") or "",
+                    'likes': await likes_el.inner_text() if likes_el else "0",
+                })
+            except Exception:
+                continue
+        return records
+
+    async def extract_fixture(self, html_file: Path):
+        """Run card extraction against a saved search page (offline check)."""
+        await self.page.set_content(html_file.read_text(encoding='utf-8'))
+        records = await self._extract_cards(self.page)
+        for record in records:
+            record['link'] = _normalize_link(record['link'])
+        return records
+
+    def open_stream(self, path: Path, resume: bool = False, target: dict = None):
+        """Append notes to a JSONL file as they are collected.
+
+        Progress is checkpointed next to it (<name>.checkpoint.json), along
+        with `target` (the run's destination or query) so --resume can find
+        the matching run. With resume=True the checkpoint and existing lines
+        are reloaded, so finished queries are skipped and no note is written
+        twice.
+        """
+        self.stream_path = path
+        self.checkpoint_path = path.with_suffix('.checkpoint.json')
+        self.target = target
+        
+        if resume and self.checkpoint_path.exists():
+            checkpoint = json.loads(self.checkpoint_path.read_text(encoding='utf-8'))
+            self._completed = checkpoint.get('completed_queries', {})
+        if resume and path.exists():
+            for note in read_notes(path):
+                self._result_keys.add(note_key(note))
+            print(f"[INFO] Resuming {path.name}: {len(self._result_keys)} notes, "
+                  f"{len(self._completed)} queries done")
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._stream = path.open('a' if resume else 'w', encoding='utf-8')
+
+    def _close_stream(self):
+        if self._stream:
+            self._stream.close()
+            self._stream = None
+
+    def _collect(self, note) -> bool:
+        """Record a newly accepted note; False if it was already collected."""
+        if self.retain:
+            key = note_key(note)
+            if key in self._result_keys:
+                return False
+            self._result_keys.add(key)
+        
+        if self.store:
+            self.store.add(note)
+        
+        if not self.retain:
+            return True
+        if self._stream:
+            self._stream.write(json.dumps(note, ensure_ascii=False) + "\n")
+            self._stream.flush()
+        else:
+            self.results.append(note)
+        return True
+
+    def _mark_done(self, query: str, count: int):
+        """Checkpoint a finished query."""
+        if self.store:
+            self.store.commit()
+        if not self.retain:
+            return
+        self._completed[query] = count
+        if not self.checkpoint_path:
+            return
+        checkpoint = {
+            'output': self.stream_path.name,
+            'target': self.target,
+            'completed_queries': self._completed,
+            'notes': len(self._result_keys),
+            'updated_at': datetime.now().isoformat(timespec='seconds')
+        }
+        tmp = self.checkpoint_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(checkpoint, ensure_ascii=False, indent=2), encoding='utf-8')
+        tmp.replace(self.checkpoint_path)
+
+    async def search(self, query: str, limit: int = 30, page=None, on_note=None, blocked: dict = None):
+        """Search XHS and extract note cards (on `page`, default self.page).
+
+        `on_note`, if given, is called with each accepted note as soon as it
+        is extracted. If a login wall or captcha stops the query, its reason
+        is recorded in `blocked` (when given) as blocked[query].
+        """
+        if query in self._completed:
+            print(f"[INFO] Skipping finished query: {query}")
+            return []
         print(f"[INFO] Searching for: {query}")
+        page = page or self.page
         
+        if self.extract_mode == 'capture':
+            handler = self._capture_handler(page)
+            self._captured[page] = []
+            page.on('response', handler)
+            try:
+                notes = await self._search(page, query, limit, on_note)
+            finally:
+                page.remove_listener('response', handler)
+                self._captured.pop(page, None)
+        else:
+            notes = await self._search(page, query, limit, on_note)
+        
+        if notes is None:
+            # Blocked: leave the query unfinished so --resume retries it
+            if blocked is not None:
+                blocked[query] = _blocked_reason(page.url) or 'blocked'
+            return []
+        self._mark_done(query, len(notes))
+        return notes
+
+    def _check_blocked(self, page, query: str):
+        """Report a login wall or captcha on `page`; its reason if the query must stop."""
+        reason = _blocked_reason(page.url)
+        if not reason:
+            return None
+        self._signal(reason, query)
+        self.telemetry.count('blocked_total', reason=reason)
+        self.telemetry.event('blocked', query=query, reason=reason, url=page.url)
+        if reason == 'login':
+            print("[ERROR] Login required. Run with --login first.")
+        else:
+            print(f"[ERROR] [{query}] Captcha challenge, stopping this query.")
+        return reason
+
+    async def _search(self, page, query: str, limit: int, on_note=None):
+        with self.telemetry.timed('query_seconds') as outcome:
+            notes = await self._search_pages(page, query, limit, on_note)
+            outcome.update(query=query, notes=len(notes) if notes is not None else None)
+        self.telemetry.count('queries_total', outcome='blocked' if notes is None else 'done')
+        return notes
+
+    async def _search_pages(self, page, query: str, limit: int, on_note=None):
         # Navigate to search
         search_url = f"{XHS_SEARCH_URL}?keyword={query}&source=web_search_result_notes"
-        await self.page.goto(search_url, wait_until='networkidle', timeout=30000)
-        await self._random_delay(2, 4)
+        await self._throttle()
+        loaded = await self._goto_search(page, search_url, query)
         
         # Check for login wall
-        if "login" in self.page.url.lower():
-            print("[ERROR] Login required. Run with --login first.")
-            return []
+        if self._check_blocked(page, query):
+            return None
+        if loaded is None:
+            self._signal(EMPTY, query)
+        else:
+            self._signal(SLOW if loaded > self.pacer.slow_seconds else OK, query)
+        await self._pace('load')
         
         notes = []
+        seen = set()
         page_count = 0
+        stale = 0
         
         while len(notes) < limit:
             page_count += 1
-            print(f"[INFO] Scraping page {page_count}, collected {len(notes)} notes...")
-            
-            # Extract note cards from current view
-            cards = await self.page.query_selector_all('section.note-item, div[data-v-a264b01a].note-item, .feeds-page .note-item')
-            
-            if not cards:
-                # Try alternative selectors
-                cards = await self.page.query_selector_all('[class*="note"]')
+            print(f"[INFO] [{query}] Scraping page {page_count}, collected {len(notes)} notes...")
             
+            with self.telemetry.timed('extract_seconds', mode=self.extract_mode) as fields:
+                cards = await self._extract_cards(page)
+                fields.update(query=query, cards=len(cards))
+            accepted = 0
             for card in cards:
                 if len(notes) >= limit:
                     break
                 
-                try:
-                    # Extract title
-                    title_el = await card.query_selector('.title, span.title, [class*="title"]')
-                    title = await title_el.inner_text() if title_el else ""
-                    
-                    # Extract author
-                    author_el = await card.query_selector('.author, .name, [class*="author"], [class*="name"]')
-                    author = await author_el.inner_text() if author_el else ""
-                    
-                    # Extract link
-                    link_el = await card.query_selector('a')
-                    link = await link_el.get_attribute('href') if link_el else ""
-                    if link and not link.startswith('http'):
-                        link = f"https://www.xiaohongshu.com{link}"
-                    
-                    # Extract likes/engagement
-                    likes_el = await card.query_selector('[class*="like"], [class*="count"]')
-                    likes = await likes_el.inner_text() if likes_el else "0"
-                    
-                    if title and title not in [n['title'] for n in notes]:
-                        notes.append({
-                            'title': title.strip(),
-                            'author': author.strip(),
-                            'link': link,
-                            'likes': likes.strip(),
-                            'query': query
-                        })
-                        
-                except Exception as e:
-                    continue
+                title = card['title'].strip()
+                key = card.get('note_id') or title
+                if title and key not in seen:
+                    seen.add(key)
+                    note = dict(card)
+                    note.update({
+                        'title': title,
+                        'author': card['author'].strip(),
+                        'link': _normalize_link(card['link']),
+                        'likes': card['likes'].strip(),
+                        'likes_count': parse_count(card['likes']),
+                        'query': query,
+                        'scraped_at': datetime.now().isoformat(timespec='seconds')
+                    })
+                    notes.append(note)
+                    accepted += 1
+                    if self._collect(note):
+                        self.telemetry.count('notes_total')
+                    if on_note:
+                        on_note(note)
             
-            # Scroll to load more
-            await self._scroll_page()
-            await self._random_delay(3, 6)
+            self.telemetry.count('cards_found_total', len(cards))
+            self.telemetry.count('cards_accepted_total', accepted)
+            self.telemetry.event('scroll', query=query, page=page_count,
+                                 found=len(cards), accepted=accepted, collected=len(notes))
+            self._signal(OK if cards else EMPTY, query, accepted)
             
             # Check for end of results
-            old_count = len(notes)
-            await asyncio.sleep(2)
-            if len(notes) == old_count and page_count > 3:
+            stale = 0 if accepted else stale + 1
+            if len(notes) >= limit:
+                break
+            if stale >= STALE_SCROLLS:
                 print("[INFO] No more new notes found.")
                 break
             
-            # Rest every 10 notes
-            if len(notes) % 10 == 0 and len(notes) > 0:
-                print(f"[INFO] Resting for 30 seconds to avoid detection...")
-                await asyncio.sleep(30)
+            # Scroll to load more
+            await self._scroll_page(page)
+            await self._pace('scroll')
+            
+            # A captcha can also appear mid-scroll
+            if self._check_blocked(page, query):
+                return None
         
-        self.results.extend(notes)
         return notes
 
-    async def search_multiple(self, destination: str, limit_per_query: int = 10):
-        """Search with multiple keyword templates."""
-        if KEYWORDS_FILE.exists():
-            config = json.loads(KEYWORDS_FILE.read_text(encoding='utf-8'))
-            templates = config.get('search_templates', [])
-        else:
-            templates = ["{destination} 攻略"]
+    async def search_multiple(self, destination: str, limit_per_query: int = 10, concurrency: int = 1):
+        """Search with multiple keyword templates.
+
+        With concurrency > 1 the templates run on that many pages at once;
+        all pages share self.limiter, so pressure stays within its budget.
+        Returns the combined notes, deduplicated across queries.
+        """
+        queries = search_queries(destination)
+        
+        if concurrency <= 1:
+            per_query = []
+            for query in queries:
+                if query in self._completed:
+                    print(f"[INFO] Skipping finished query: {query}")
+                    continue
+                per_query.append(await self.search(query, limit=limit_per_query))
+                await self._pace('between')
+            return dedupe_notes(n for notes in per_query for n in notes)
+        
+        # Page pool: the main page plus extra tabs in the same (logged-in) context
+        extra_pages = [await self.context.new_page() for _ in range(min(concurrency, len(queries)) - 1)]
+        pool = asyncio.Queue()
+        for page in [self.page] + extra_pages:
+            pool.put_nowait(page)
+        
+        async def run(query):
+            page = await pool.get()
+            try:
+                notes = await self.search(query, limit=limit_per_query, page=page)
+                await self._pace('between')
+                return notes
+            finally:
+                pool.put_nowait(page)
+        
+        queries = [query for query in queries if query not in self._completed]
+        try:
+            per_query = await asyncio.gather(*(run(query) for query in queries))
+        finally:
+            for page in extra_pages:
+                await page.close()
+        
+        return dedupe_notes(n for notes in per_query for n in notes)
+
+    async def fetch_details(self, notes, cache: DetailCache, concurrency: int = 2) -> int:
+        """Visit note pages missing from `cache` and store their body text and tags.
+
+        Pages come from the same pool-of-tabs scheme as search_multiple and
+        every load goes through the rate limiter and pacer. A login wall or
+        captcha stops the remaining fetches. Returns the number fetched.
+        """
+        todo = {}
+        for note in notes:
+            key = note_key(note)
+            if note.get('link') and key not in todo and key not in cache:
+                todo[key] = note['link']
+        if not todo:
+            print("[INFO] All note details already cached.")
+            return 0
+        print(f"[INFO] Fetching {len(todo)} note details...")
+        
+        extra_pages = [await self.context.new_page() for _ in range(min(concurrency, len(todo)) - 1)]
+        pool = asyncio.Queue()
+        for page in [self.page] + extra_pages:
+            pool.put_nowait(page)
+        fetched = 0
+        stopped = False
         
-        all_notes = []
-        for template in templates:
-            query = template.format(destination=destination)
-            notes = await self.search(query, limit=limit_per_query)
-            all_notes.extend(notes)
-            await self._random_delay(5, 10)  # Longer delay between queries
+        async def run(key, link):
+            nonlocal fetched, stopped
+            if stopped:
+                return
+            page = await pool.get()
+            try:
+                if stopped:
+                    return
+                await self._throttle()
+                with self.telemetry.timed('detail_seconds') as fields:
+                    fields['key'] = key
+                    try:
+                        await page.goto(link, wait_until='domcontentloaded', timeout=30000)
+                        raw = await page.evaluate(EXTRACT_DETAIL_JS, key)
+                    except Exception as e:
+                        print(f"[WARN] Detail {key}: {e}")
+                        raw = None
+                if self._check_blocked(page, key):
+                    stopped = True
+                    return
+                self._signal(OK if raw else EMPTY, key)
+                if raw:
+                    cache.put(key, decode_detail(raw))
+                    fetched += 1
+                await self._pace('scroll')
+            finally:
+                pool.put_nowait(page)
         
-        return all_notes
+        try:
+            await asyncio.gather(*(run(key, link) for key, link in todo.items()))
+        finally:
+            cache.commit()
+            for page in extra_pages:
+                await page.close()
+        print(f"[INFO] Fetched {fetched}/{len(todo)} note details")
+        return fetched
 
     def save_results(self, filename: str = None):
-        """Save results to JSON file."""
+        """Save results to JSON file (streamed runs are already on disk)."""
+        if self._stream:
+            self._close_stream()
+            print(f"[INFO] Results saved to {self.stream_path}")
+            return self.stream_path
+        
         OUTPUT_DIR.mkdir(exist_ok=True)
         
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"xhs_results_{timestamp}.json"
+        elif Path(filename).suffix == '.jsonl':
+            # read_notes() would parse a JSON array in a .jsonl file line by line
+            filename = str(Path(filename).with_suffix('.json'))
+            print(f"[INFO] Writing a JSON array to {Path(filename).name} (use --format jsonl to stream)")
         
         output_path = OUTPUT_DIR / filename
         output_path.write_text(
@@ -224,6 +691,48 @@ class XHSScraper:
         return output_path
 
 
+def search_queries(destination: str) -> list:
+    """Expand the configured search templates for a destination."""
+    if KEYWORDS_FILE.exists():
+        config = json.loads(KEYWORDS_FILE.read_text(encoding='utf-8'))
+        templates = config.get('search_templates', [])
+    else:
+        templates = ["{destination} 攻略"]
+    return [template.format(destination=destination) for template in templates]
+
+
+def resolve_stream_path(output: str = None, resume: bool = False, target: dict = None) -> Path:
+    """Pick the JSONL file for a run; --resume defaults to the latest checkpoint
+    of the same destination or query (`target`).
+
+    An --output without a .jsonl suffix gets one, since read_notes() picks
+    the parser from the suffix. Resuming an --output whose checkpoint belongs
+    to another target raises ValueError.
+    """
+    if output:
+        path = Path(output)
+        if path.suffix != '.jsonl':
+            path = path.with_suffix('.jsonl')
+            print(f"[INFO] Streaming JSONL to {path.name} (use --format json for a .json array)")
+        path = path if path.is_absolute() else OUTPUT_DIR / path
+        checkpoint_path = path.with_suffix('.checkpoint.json')
+        if resume and checkpoint_path.exists():
+            found = json.loads(checkpoint_path.read_text(encoding='utf-8')).get('target')
+            if found and target and found != target:
+                raise ValueError(f"{checkpoint_path.name} is a run for {found}, not {target}")
+        return path
+    if resume:
+        checkpoints = sorted(OUTPUT_DIR.glob("*.checkpoint.json"), key=lambda p: p.stat().st_mtime)
+        for checkpoint_path in reversed(checkpoints):
+            checkpoint = json.loads(checkpoint_path.read_text(encoding='utf-8'))
+            if checkpoint.get('target') == target:
+                return OUTPUT_DIR / checkpoint['output']
+        print("[WARN] No checkpoint for this destination/query (pass --output to resume an older run), "
+              "starting a new run.")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return OUTPUT_DIR / f"xhs_results_{timestamp}.jsonl"
+
+
 async def main():
     parser = argparse.ArgumentParser(description="XHS Travel Scraper")
     parser.add_argument("--login", action="store_true", help="Login mode (saves cookies)")
@@ -231,10 +740,50 @@ async def main():
     parser.add_argument("--destination", type=str, help="Destination for multi-query search")
     parser.add_argument("--limit", type=int, default=30, help="Max notes to scrape")
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
+    add_scraper_arguments(parser)
+    parser.add_argument("--capture-dir", type=str,
+                        help="In capture mode, also record response bodies here for offline replay")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Pages to run --destination templates on at once")
+    parser.add_argument("--format", choices=('jsonl', 'json'), default='jsonl',
+                        help="jsonl streams each note to disk with checkpoints; json writes once at the end")
+    parser.add_argument("--output", type=str, help="Output file name (under output/ unless absolute)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the checkpoint of --output (or the latest run of the same "
+                             "--destination/--query); jsonl only")
+    parser.add_argument("--store", type=str, nargs='?', const=str(STORE_FILE),
+                        help="Also upsert notes into the SQLite note store (default output/notes.db)")
+    parser.add_argument("--fixture", type=str, help="Extract cards from a saved HTML page and print them")
+    parser.add_argument("--details", type=str, nargs='?', const=str(DETAILS_FILE),
+                        help="After searching, fetch note bodies and tags into the detail cache "
+                             "(default output/details.db); analyzer.py --details uses them")
+    parser.add_argument("--trace", type=str,
+                        help="Append structured scrape events to this JSONL file (under output/ unless absolute)")
+    parser.add_argument("--metrics", type=str,
+                        help="Write counters and timings as a Prometheus textfile when the run ends")
     
     args = parser.parse_args()
+    if args.resume and args.format == 'json':
+        parser.error("--resume needs --format jsonl (json output is written once, without a checkpoint)")
+    
+    # Settle the stream file before launching the browser
+    stream_path = target = None
+    if args.format == 'jsonl' and (args.destination or args.query) and not (args.login or args.fixture):
+        target = {'destination': args.destination} if args.destination else {'query': args.query}
+        try:
+            stream_path = resolve_stream_path(args.output, args.resume, target)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            return
     
-    scraper = XHSScraper()
+    scraper = XHSScraper(
+        extract_mode=args.extract,
+        capture_dir=Path(args.capture_dir) if args.capture_dir else None,
+        limiter=TokenBucket(args.rate, args.burst),
+        store=NoteStore(Path(args.store)) if args.store else None,
+        telemetry=Telemetry(output_file(args.trace), output_file(args.metrics)),
+        **scraper_options(args)
+    )
     
     try:
         # Login mode should never be headless
@@ -242,12 +791,29 @@ async def main():
         
         if args.login:
             await scraper.login()
-        elif args.destination:
-            await scraper.search_multiple(args.destination, limit_per_query=args.limit // 6)
-            scraper.save_results()
-        elif args.query:
-            await scraper.search(args.query, limit=args.limit)
-            scraper.save_results()
+        elif args.fixture:
+            records = await scraper.extract_fixture(Path(args.fixture))
+            print(json.dumps(records, ensure_ascii=False, indent=2))
+        elif args.destination or args.query:
+            if stream_path:
+                scraper.open_stream(stream_path, resume=args.resume, target=target)
+            
+            if args.destination:
+                notes = await scraper.search_multiple(
+                    args.destination,
+                    limit_per_query=args.limit // 6,
+                    concurrency=args.concurrency
+                )
+            else:
+                notes = await scraper.search(args.query, limit=args.limit)
+            scraper.save_results(args.output)
+            
+            if args.details:
+                cache = DetailCache(Path(args.details))
+                try:
+                    await scraper.fetch_details(notes, cache, max(1, args.concurrency))
+                finally:
+                    cache.close()
         else:
             print("Usage: python scraper.py --login | --query <query> | --destination <destination>")
     
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+XHS Note Store
+==============
+Persistent SQLite archive of scraped notes, shared across runs.
+
+Notes are keyed by note_key() (note ID, else link, else title). Repeat
+sightings only update last_seen and append to the engagement history, and
+titles are indexed with FTS5: a trigram index for terms of 3+ characters
+and a unigram/bigram index for the short terms most Chinese place and topic
+words are ("黄山", "酒店"), so searches never scan the whole table.
+
+Usage:
+    python store.py --import xhs_results_20260115_135802.jsonl
+    python store.py --match "黄山 酒店" --since 30
+"""
+
+import json
+import argparse
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from notes import note_key, read_notes
+
+SCRIPT_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPT_DIR.parent
+OUTPUT_DIR = SKILL_DIR / "output"
+STORE_FILE = OUTPUT_DIR / "notes.db"
+
+# trigram tokens are 3 characters; shorter terms use the notes_grams index
+FTS_MIN_TERM = 3
+# Bumped when an index needs rebuilding from the notes table
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    author TEXT,
+    link TEXT,
+    query TEXT,
+    likes TEXT,
+    data TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notes_last_seen ON notes(last_seen);
+
+CREATE TABLE IF NOT EXISTS engagement (
+    note_id INTEGER NOT NULL REFERENCES notes(id),
+    seen_at TEXT NOT NULL,
+    likes TEXT,
+    collects TEXT,
+    comments TEXT,
+    shares TEXT
+);
+CREATE INDEX IF NOT EXISTS engagement_note ON engagement(note_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, content='notes', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts(rowid, title) VALUES (new.id, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, title) VALUES ('delete', old.id, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_au AFTER UPDATE OF title ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    INSERT INTO notes_fts(rowid, title) VALUES (new.id, new.title);
+END;
+
+-- Characters and character pairs of each title (see title_grams), kept by NoteStore.add
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_grams USING fts5(
+    grams, content='', detail='none'
+);
+"""
+
+ENGAGEMENT_FIELDS = ('likes', 'collects', 'comments', 'shares')
+
+
+def title_grams(title: str) -> str:
+    """Space-separated characters and character pairs of a title, for notes_grams."""
+    text = (title or '').lower()
+    grams = set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+    return " ".join(sorted(grams))
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+class NoteStore:
+    def __init__(self, path: Path = STORE_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._rebuild_grams()
+
+    def _rebuild_grams(self):
+        """Index the titles of a store created before notes_grams existed."""
+        self.conn.execute("INSERT INTO notes_grams(notes_grams) VALUES ('delete-all')")
+        self.conn.executemany(
+            "INSERT INTO notes_grams (rowid, grams) VALUES (?, ?)",
+            ((row_id, title_grams(title)) for row_id, title in self.conn.execute("SELECT id, title FROM notes"))
+        )
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    def add(self, note: dict, seen_at: str = None):
+        """Insert or refresh a note; engagement is logged when it changes."""
+        seen_at = seen_at or datetime.now().isoformat(timespec='seconds')
+        # The columns have TEXT affinity: compare as stored, or 120 != '120' every time
+        engagement = tuple(None if note.get(field) is None else str(note.get(field))
+                           for field in ENGAGEMENT_FIELDS)
+        title = note.get('title', '')
+
+        row = self.conn.execute(
+            "SELECT id, title FROM notes WHERE key = ?", (note_key(note),)
+        ).fetchone()
+        if row is None:
+            cur = self.conn.execute(
+                "INSERT INTO notes (key, title, author, link, query, likes, data, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (note_key(note), title, note.get('author', ''), note.get('link', ''),
+                 note.get('query', ''), note.get('likes', ''),
+                 json.dumps(note, ensure_ascii=False), seen_at, seen_at)
+            )
+            row_id = cur.lastrowid
+            self.conn.execute("INSERT INTO notes_grams (rowid, grams) VALUES (?, ?)",
+                              (row_id, title_grams(title)))
+            changed = True
+        else:
+            row_id, old_title = row
+            if old_title != title:
+                self.conn.execute("INSERT INTO notes_grams (notes_grams, rowid, grams) VALUES ('delete', ?, ?)",
+                                  (row_id, title_grams(old_title)))
+                self.conn.execute("INSERT INTO notes_grams (rowid, grams) VALUES (?, ?)",
+                                  (row_id, title_grams(title)))
+            last = self.conn.execute(
+                "SELECT likes, collects, comments, shares FROM engagement "
+                "WHERE note_id = ? ORDER BY rowid DESC LIMIT 1", (row_id,)
+            ).fetchone()
+            changed = last != engagement
+            self.conn.execute(
+                "UPDATE notes SET title = ?, author = ?, link = ?, likes = ?, data = ?, last_seen = ? "
+                "WHERE id = ?",
+                (title, note.get('author', ''), note.get('link', ''),
+                 note.get('likes', ''), json.dumps(note, ensure_ascii=False), seen_at, row_id)
+            )
+
+        if changed:
+            self.conn.execute(
+                "INSERT INTO engagement (note_id, seen_at, likes, collects, comments, shares) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (row_id, seen_at) + engagement
+            )
+
+    def add_many(self, notes) -> int:
+        count = 0
+        for note in notes:
+            self.add(note)
+            count += 1
+        self.commit()
+        return count
+
+    def search(self, match: str = None, since_days: float = None, limit: int = None):
+        """Yield stored notes whose title contains every term of `match`,
+        last seen within `since_days`, most recently seen first."""
+        where, params = [], []
+        fts_terms, gram_terms = [], []
+        for term in (match or "").split():
+            if len(term) >= FTS_MIN_TERM:
+                fts_terms.append(_fts_phrase(term))
+                continue
+            if any(ch.isalnum() for ch in term):
+                gram_terms.append(_fts_phrase(term))
+            # The grams tokenizer drops punctuation, so the index only narrows
+            # short terms down; LIKE confirms the exact substring
+            where.append("notes.title LIKE ?")
+            params.append(f"%{term}%")
+        if fts_terms:
+            where.append("notes.id IN (SELECT rowid FROM notes_fts WHERE notes_fts MATCH ?)")
+            params.append(" AND ".join(fts_terms))
+        if gram_terms:
+            where.append("notes.id IN (SELECT rowid FROM notes_grams WHERE notes_grams MATCH ?)")
+            params.append(" AND ".join(gram_terms))
+        if since_days is not None:
+            since = datetime.now() - timedelta(days=since_days)
+            where.append("notes.last_seen >= ?")
+            params.append(since.isoformat(timespec='seconds'))
+
+        sql = "SELECT data, first_seen, last_seen FROM notes"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY last_seen DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        for data, first_seen, last_seen in self.conn.execute(sql, params):
+            note = json.loads(data)
+            note['first_seen'] = first_seen
+            note['last_seen'] = last_seen
+            yield note
+
+    def history(self, key: str) -> list:
+        """Engagement history of one note, oldest first."""
+        rows = self.conn.execute(
+            "SELECT e.seen_at, e.likes, e.collects, e.comments, e.shares FROM engagement e "
+            "JOIN notes n ON n.id = e.note_id WHERE n.key = ? ORDER BY e.rowid", (key,)
+        )
+        return [dict(zip(('seen_at',) + ENGAGEMENT_FIELDS, row)) for row in rows]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XHS Note Store")
+    parser.add_argument("--db", type=str, default=str(STORE_FILE), help="Store database file")
+    parser.add_argument("--import", dest="imports", type=str, nargs='+',
+                        help="Scraper result files (.json/.jsonl) to load into the store")
+    parser.add_argument("--match", type=str, help="Title terms to search for")
+    parser.add_argument("--since", type=float, help="Only notes seen in the last N days")
+    parser.add_argument("--limit", type=int, default=20, help="Max notes to print")
+
+    args = parser.parse_args()
+    store = NoteStore(Path(args.db))
+
+    try:
+        if args.imports:
+            for name in args.imports:
+                path = Path(name)
+                if not path.is_absolute() and not path.exists():
+                    path = OUTPUT_DIR / path
+                count = store.add_many(read_notes(path))
+                print(f"[INFO] Imported {count} notes from {path}")
+            print(f"[INFO] Store now holds {store.count()} notes")
+        else:
+            notes = list(store.search(args.match, args.since, args.limit))
+            print(json.dumps(notes, ensure_ascii=False, indent=2))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Scrape Telemetry
+================
+Counters, timing summaries and a structured event trace for a scraper run,
+so pacing and concurrency can be tuned from data.
+
+Events are appended to a JSONL trace as they happen; counters and timings
+are written as a Prometheus textfile (node_exporter textfile collector
+format) when the run ends.
+
+Usage:
+    python scraper.py --destination "黄山" --trace trace.jsonl --metrics xhs.prom
+    python telemetry.py --summarize output/trace.jsonl
+"""
+
+import json
+import time
+import argparse
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+SKILL_DIR = SCRIPT_DIR.parent
+OUTPUT_DIR = SKILL_DIR / "output"
+
+METRIC_PREFIX = "xhs_scraper_"
+# Sleeps taken between queries rather than while working a result page
+IDLE_SLEEP_KINDS = ('between',)
+
+METRIC_HELP = {
+    'goto_seconds': ("summary", "Search page navigation latency"),
+    'extract_seconds': ("summary", "Card extraction time per scroll"),
+    'sleep_seconds': ("summary", "Time spent in deliberate delays, by kind"),
+    'throttle_seconds': ("summary", "Time spent waiting on the rate limiter"),
+    'query_seconds': ("summary", "Wall time per search query"),
+    'cards_found_total': ("counter", "Cards seen on result pages"),
+    'cards_accepted_total': ("counter", "Cards accepted as new notes for their query"),
+    'notes_total': ("counter", "Notes collected across all queries"),
+    'queries_total': ("counter", "Search queries run, by outcome"),
+    'blocked_total': ("counter", "Login wall and captcha hits"),
+    'first_card_seconds': ("summary", "Navigation start until the first note card, by wait mode"),
+    'requests_blocked_total': ("counter", "Requests aborted by lean loading, by kind"),
+    'detail_seconds': ("summary", "Note detail page load and extraction time"),
+    'pace_signals_total': ("counter", "Load/scroll outcomes reported to the pacer, by signal"),
+}
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Telemetry:
+    """Metrics and trace for one scraper run; a no-op sink without paths."""
+
+    def __init__(self, trace_path: Path = None, metrics_path: Path = None):
+        self.metrics_path = metrics_path
+        self.started = time.monotonic()
+        self.counters = Counter()
+        # (name, labels) -> [count, sum]
+        self.timings = defaultdict(lambda: [0, 0.0])
+        self._trace = None
+        if trace_path:
+            trace_path.parent.mkdir(parents=True, exist_ok=True)
+            self._trace = trace_path.open('a', encoding='utf-8')
+
+    def event(self, name: str, **fields):
+        """Append one event to the trace."""
+        if not self._trace:
+            return
+        record = {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            't': round(time.monotonic() - self.started, 3),
+            'event': name,
+            **fields
+        }
+        self._trace.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._trace.flush()
+
+    def count(self, name: str, value: float = 1, **labels):
+        self.counters[(name, _labels(labels))] += value
+
+    def observe(self, name: str, seconds: float, **labels):
+        timing = self.timings[(name, _labels(labels))]
+        timing[0] += 1
+        timing[1] += seconds
+
+    @contextmanager
+    def timed(self, name: str, **labels):
+        """Time a block into summary `name` and trace it as an event.
+
+        The yielded dict is merged into the event, for fields only known
+        once the block has run.
+        """
+        fields = {}
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe(name, seconds, **labels)
+            self.event(name.replace('_seconds', ''), seconds=round(seconds, 3), **labels, **fields)
+
+    def total(self, name: str, **match) -> float:
+        """Sum of a counter or timing across label sets containing `match`."""
+        wanted = set(_labels(match))
+        counter = sum(v for (n, labels), v in self.counters.items() if n == name and wanted <= set(labels))
+        timing = sum(t[1] for (n, labels), t in self.timings.items() if n == name and wanted <= set(labels))
+        return counter + timing
+
+    def _mean(self, name: str) -> float:
+        rows = [t for (n, _), t in self.timings.items() if n == name]
+        count = sum(t[0] for t in rows)
+        return sum(t[1] for t in rows) / count if count else 0.0
+
+    def summary(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        notes = self.total('notes_total')
+        busy = self.total('query_seconds')
+        sleeping = sum(
+            t[1] for (n, labels), t in self.timings.items()
+            if n == 'sleep_seconds' and dict(labels).get('kind') not in IDLE_SLEEP_KINDS
+        )
+        return {
+            'elapsed_seconds': round(elapsed, 3),
+            'notes': int(notes),
+            'notes_per_minute': round(notes / elapsed * 60, 3) if elapsed else 0.0,
+            'query_seconds': round(busy, 3),
+            'sleep_seconds': round(sleeping, 3),
+            'throttle_seconds': round(self.total('throttle_seconds'), 3),
+            'work_seconds': round(max(0.0, busy - sleeping - self.total('throttle_seconds')), 3),
+            'goto_seconds': round(self.total('goto_seconds'), 3),
+            'first_card_avg_seconds': round(self._mean('first_card_seconds'), 3),
+            'requests_blocked': int(self.total('requests_blocked_total')),
+            'extract_seconds': round(self.total('extract_seconds'), 3),
+            'cards_found': int(self.total('cards_found_total')),
+            'cards_accepted': int(self.total('cards_accepted_total')),
+            'login_walls': int(self.total('blocked_total', reason='login')),
+            'captchas': int(self.total('blocked_total', reason='captcha')),
+        }
+
+    def render_metrics(self) -> str:
+        """Prometheus text exposition of everything recorded so far."""
+        lines = []
+        names = sorted({n for n, _ in self.counters} | {n for n, _ in self.timings})
+        for name in names:
+            kind, help_text = METRIC_HELP.get(name, ("untyped", name))
+            metric = METRIC_PREFIX + name
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for (n, labels), value in sorted(self.counters.items()):
+                if n == name:
+                    lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+            for (n, labels), (count, total) in sorted(self.timings.items()):
+                if n == name:
+                    lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+                    lines.append(f"{metric}_sum{_format_labels(labels)} {total:.6f}")
+
+        summary = self.summary()
+        for name, key, help_text in (
+            ('notes_per_minute', 'notes_per_minute', "Collected notes per minute of run time"),
+            ('run_seconds', 'elapsed_seconds', "Run wall time"),
+            ('work_seconds', 'work_seconds', "Query time not spent sleeping or throttled"),
+        ):
+            lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} gauge")
+            lines.append(f"{METRIC_PREFIX}{name} {summary[key]:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path: Path = None):
+        """Write the textfile atomically so a collector never reads half of it."""
+        path = path or self.metrics_path
+        if not path:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.write_text(self.render_metrics(), encoding='utf-8')
+        tmp.replace(path)
+        return path
+
+    def report(self):
+        summary = self.summary()
+        if not self.total('queries_total'):
+            return
+        print("\n=== 抓取统计 ===")
+        print(f"  notes: {summary['notes']} ({summary['notes_per_minute']:.1f}/min)")
+        print(f"  cards: {summary['cards_accepted']}/{summary['cards_found']} accepted")
+        print(f"  query time: {summary['query_seconds']:.1f}s = work {summary['work_seconds']:.1f}s"
+              f" + sleep {summary['sleep_seconds']:.1f}s + throttle {summary['throttle_seconds']:.1f}s")
+        print(f"  goto: {summary['goto_seconds']:.1f}s, first card: {summary['first_card_avg_seconds']:.2f}s avg, "
+              f"extract: {summary['extract_seconds']:.1f}s")
+        if summary['requests_blocked']:
+            print(f"  requests blocked: {summary['requests_blocked']}")
+        if summary['login_walls'] or summary['captchas']:
+            print(f"  blocked: {summary['login_walls']} login walls, {summary['captchas']} captchas")
+
+    def close(self):
+        """Print the run summary, write the metrics file and close the trace."""
+        self.report()
+        self.event('run_end', **self.summary())
+        path = self.write_metrics()
+        if path:
+            print(f"[INFO] Metrics saved to {path}")
+        if self._trace:
+            self._trace.close()
+            self._trace = None
+
+
+def summarize_trace(path: Path) -> dict:
+    """Aggregate a trace file: event counts and time per event type."""
+    counts = Counter()
+    seconds = Counter()
+    with path.open(encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            counts[record['event']] += 1
+            seconds[record['event']] += record.get('seconds', 0)
+    return {name: {'count': counts[name], 'seconds': round(seconds[name], 3)} for name in sorted(counts)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Telemetry")
+    parser.add_argument("--summarize", type=str, required=True, help="Trace JSONL file to aggregate")
+
+    args = parser.parse_args()
+    path = Path(args.summarize)
+    if not path.is_absolute() and not path.exists():
+        path = OUTPUT_DIR / path
+
+    print(f"=== {path.name} ===")
+    for name, row in summarize_trace(path).items():
+        print(f"  {name:<12} {row['count']:>6}  {row['seconds']:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
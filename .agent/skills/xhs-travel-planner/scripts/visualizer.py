@@ -4,18 +4,171 @@ XHS Mindmap Visualizer
 ======================
 Generates Mermaid mindmap from analyzed travel notes.
 
+The Markdown report is streamed to disk one category at a time. An offline
+HTML viewer lists every note: mindmap branches expand on demand and each
+category's notes are paged, from a compact JSON index embedded in the page,
+so large destinations open instantly.
+
 Usage:
     python visualizer.py --input analyzed.json --destination "黄山"
+    python visualizer.py --input analyzed.json --destination "黄山" --top 0   # every note in the report
 """
 
 import json
 import argparse
 from pathlib import Path
 
+from notes import read_analyzed
+from ranking import Ranker
+
 SCRIPT_DIR = Path(__file__).parent
 SKILL_DIR = SCRIPT_DIR.parent
 OUTPUT_DIR = SKILL_DIR / "output"
 
+# Category icons
+ICONS = {
+    "交通": "🚗",
+    "住宿": "🏨",
+    "饮食": "🍜",
+    "优惠": "💰",
+    "学生": "🎓",
+    "攻略": "📋",
+    "其他": "📌"
+}
+
+VIEWER_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>__TITLE__</title>
+<style>
+body { margin: 0; font: 14px/1.6 -apple-system, "PingFang SC", "Microsoft YaHei", sans-serif; color: #222; }
+header { display: flex; gap: 16px; align-items: center; padding: 12px 20px; border-bottom: 1px solid #eee; }
+header h1 { font-size: 18px; margin: 0; flex: 1; }
+header input { padding: 6px 10px; width: 240px; border: 1px solid #ccc; border-radius: 6px; }
+main { display: flex; height: calc(100vh - 58px); }
+nav { width: 40%; overflow: auto; padding: 12px 20px; border-right: 1px solid #eee; }
+nav ul { list-style: none; margin: 0; padding-left: 18px; border-left: 2px solid #f0d0d0; }
+nav .root { font-weight: bold; font-size: 16px; }
+nav .cat { cursor: pointer; font-weight: bold; padding: 2px 0; }
+nav .cat.active { color: #ff2442; }
+nav .more { cursor: pointer; color: #888; }
+section { flex: 1; overflow: auto; padding: 12px 20px; }
+#bar { display: flex; gap: 10px; align-items: center; position: sticky; top: 0; background: #fff; padding-bottom: 8px; }
+#info { flex: 1; color: #666; }
+a { color: #2060c0; text-decoration: none; }
+small { color: #999; margin-left: 6px; }
+</style>
+</head>
+<body>
+<header><h1>__TITLE__</h1><input id="q" type="search" placeholder="在当前分类中搜索标题"></header>
+<main>
+<nav id="tree"></nav>
+<section>
+<div id="bar"><span id="info"></span><button id="prev">上一页</button><span id="page"></span><button id="next">下一页</button></div>
+<ol id="list"></ol>
+</section>
+</main>
+<script id="index" type="application/json">__INDEX__</script>
+<script>
+const D = JSON.parse(document.getElementById('index').textContent);
+const BRANCH = 20, PAGE = 100;
+const $ = (id) => document.getElementById(id);
+let current = null, active = null, shown = [], page = 0;
+
+function noteItem(i) {
+  const [title, link, author, likes] = D.notes[i];
+  const li = document.createElement('li');
+  const a = document.createElement(link ? 'a' : 'span');
+  a.textContent = title || '无标题';
+  if (link) { a.href = link; a.target = '_blank'; a.rel = 'noopener'; }
+  li.appendChild(a);
+  if (author || likes) {
+    const meta = document.createElement('small');
+    meta.textContent = `${author} · 点赞 ${likes}`;
+    li.appendChild(meta);
+  }
+  return li;
+}
+
+// A mindmap branch whose notes are only built when it is first expanded
+function branch(cat) {
+  const li = document.createElement('li');
+  const head = document.createElement('div');
+  head.className = 'cat';
+  head.textContent = `${cat.icon} ${cat.name} (${cat.ids.length})`;
+  li.appendChild(head);
+  let ul = null, more = null, count = 0;
+  const grow = () => {
+    const end = Math.min(count + BRANCH, cat.ids.length);
+    for (; count < end; count++) ul.insertBefore(noteItem(cat.ids[count]), more);
+    more.hidden = count >= cat.ids.length;
+    more.textContent = `显示更多（还有 ${cat.ids.length - count} 篇）`;
+  };
+  head.onclick = () => {
+    if (!ul) {
+      ul = document.createElement('ul');
+      more = document.createElement('li');
+      more.className = 'more';
+      more.onclick = grow;
+      ul.appendChild(more);
+      li.appendChild(ul);
+      grow();
+    } else if (current === cat) {
+      ul.hidden = !ul.hidden;
+    }
+    if (active) active.classList.remove('active');
+    active = head;
+    head.classList.add('active');
+    select(cat);
+  };
+  return li;
+}
+
+function select(cat) {
+  current = cat;
+  filter();
+}
+
+function filter() {
+  const q = $('q').value.trim().toLowerCase();
+  const ids = current ? current.ids : [];
+  shown = q ? ids.filter((i) => (D.notes[i][0] || '').toLowerCase().includes(q)) : ids;
+  page = 0;
+  render();
+}
+
+function render() {
+  const pages = Math.max(1, Math.ceil(shown.length / PAGE));
+  const start = page * PAGE;
+  const frag = document.createDocumentFragment();
+  for (const i of shown.slice(start, start + PAGE)) frag.appendChild(noteItem(i));
+  $('list').replaceChildren(frag);
+  $('list').start = start + 1;
+  $('info').textContent = current ? `${current.icon} ${current.name}：${shown.length} 篇` : '';
+  $('page').textContent = `${page + 1} / ${pages}`;
+  $('prev').disabled = page === 0;
+  $('next').disabled = page >= pages - 1;
+}
+
+$('prev').onclick = () => { page--; render(); };
+$('next').onclick = () => { page++; render(); };
+$('q').oninput = filter;
+
+const root = document.createElement('div');
+root.className = 'root';
+root.textContent = `${D.destination}攻略（${D.notes.length} 篇笔记）`;
+const ul = document.createElement('ul');
+for (const cat of D.categories) if (cat.ids.length) ul.appendChild(branch(cat));
+$('tree').append(root, ul);
+const first = ul.querySelector('.cat');
+if (first) first.click();
+</script>
+</body>
+</html>
+"""
+
 
 def escape_mermaid(text: str) -> str:
     """Escape special characters for Mermaid."""
@@ -32,39 +185,40 @@ def escape_mermaid(text: str) -> str:
     return text
 
 
-def generate_mindmap(categorized: dict, destination: str = "旅行") -> str:
-    """Generate Mermaid mindmap syntax."""
+def generate_mindmap(categorized: dict, destination: str = "旅行",
+                     ranker: Ranker = None, top: int = 5) -> str:
+    """Generate Mermaid mindmap syntax (top notes per category by score).
+
+    Kept small on purpose: Mermaid freezes on thousands of nodes. The HTML
+    viewer shows every note.
+    """
+    ranker = ranker or Ranker.from_config()
     lines = ["mindmap"]
     lines.append(f"  root(({destination}攻略))")
     
-    # Category icons
-    icons = {
-        "交通": "🚗",
-        "住宿": "🏨",
-        "饮食": "🍜",
-        "优惠": "💰",
-        "学生": "🎓",
-        "攻略": "📋",
-        "其他": "📌"
-    }
-    
     for category, notes in categorized.items():
         if not notes:
             continue
         
-        icon = icons.get(category, "📌")
+        icon = ICONS.get(category, "📌")
         lines.append(f"    {icon} {category}")
         
-        # Limit to top 5 notes per category
-        for note in notes[:5]:
+        # Limit to the top-ranked notes per category
+        for note in ranker.top_k(notes, top, category):
             title = escape_mermaid(note.get('title', '无标题'))
             lines.append(f"      {title}")
     
     return "\n".join(lines)
 
 
-def generate_markdown_report(categorized: dict, destination: str, mindmap: str) -> str:
-    """Generate a complete markdown report."""
+def iter_markdown_report(categorized: dict, destination: str, mindmap: str,
+                         ranker: Ranker = None, top: int = 10):
+    """Yield the markdown report in sections (header, then one per category).
+
+    Joining the sections with newlines gives the whole report; top=0
+    lists every note.
+    """
+    ranker = ranker or Ranker.from_config()
     report = []
     report.append(f"# {destination}旅行攻略\n")
     report.append(f"*数据来源: 小红书 | 由 XHS Travel Planner 自动生成*\n")
@@ -77,25 +231,16 @@ def generate_markdown_report(categorized: dict, destination: str, mindmap: str)
     
     # Detailed sections
     report.append("## 详细内容\n")
-    
-    icons = {
-        "交通": "🚗",
-        "住宿": "🏨", 
-        "饮食": "🍜",
-        "优惠": "💰",
-        "学生": "🎓",
-        "攻略": "📋",
-        "其他": "📌"
-    }
+    yield "\n".join(report)
     
     for category, notes in categorized.items():
         if not notes:
             continue
         
-        icon = icons.get(category, "📌")
-        report.append(f"### {icon} {category}\n")
+        icon = ICONS.get(category, "📌")
+        report = [f"### {icon} {category}\n"]
         
-        for i, note in enumerate(notes[:10], 1):
+        for i, note in enumerate(ranker.top_k(notes, top or len(notes), category), 1):
             title = note.get('title', '无标题')
             link = note.get('link', '')
             author = note.get('author', '')
@@ -110,14 +255,88 @@ def generate_markdown_report(categorized: dict, destination: str, mindmap: str)
                 report.append(f"   - 作者: {author} | 点赞: {likes}")
         
         report.append("")
-    
-    return "\n".join(report)
+        yield "\n".join(report)
+
+
+def generate_markdown_report(categorized: dict, destination: str, mindmap: str,
+                             ranker: Ranker = None, top: int = 10) -> str:
+    """Generate a complete markdown report."""
+    return "\n".join(iter_markdown_report(categorized, destination, mindmap, ranker, top))
+
+
+def build_viewer_index(categorized: dict, destination: str, ranker: Ranker = None) -> dict:
+    """Compact index for the HTML viewer.
+
+    Each note is stored once as [title, link, author, likes]; categories
+    hold note indexes, best-ranked first.
+    """
+    ranker = ranker or Ranker.from_config()
+    table = []
+    index = {}
+    categories = []
+    for category, notes in ranker.rank(categorized).items():
+        ids = []
+        for note in notes:
+            key = id(note)
+            if key not in index:
+                index[key] = len(table)
+                table.append([note.get('title', ''), note.get('link', ''),
+                              note.get('author', ''), note.get('likes', '')])
+            ids.append(index[key])
+        categories.append({'name': category, 'icon': ICONS.get(category, "📌"), 'ids': ids})
+    return {'destination': destination, 'notes': table, 'categories': categories}
+
+
+def _script_json(data) -> str:
+    # "<" escaped so note titles cannot close the <script> element
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('<', '\\u003c')
+
+
+def write_viewer(index: dict, path: Path):
+    """Write the self-contained HTML viewer, streaming the index note by note."""
+    title = f"{index['destination']}旅行攻略".replace('&', '&amp;').replace('<', '&lt;')
+    head, tail = VIEWER_TEMPLATE.replace('__TITLE__', title).split('__INDEX__')
+    with path.open('w', encoding='utf-8') as f:
+        f.write(head)
+        f.write('{"destination":' + _script_json(index['destination']) + ',"notes":[')
+        for i, note in enumerate(index['notes']):
+            f.write((',' if i else '') + _script_json(note))
+        f.write('],"categories":' + _script_json(index['categories']) + '}')
+        f.write(tail)
+
+
+def save_outputs(mindmap: str, report, destination: str, viewer: dict = None) -> tuple:
+    """Write mindmap.mmd, {destination}_攻略.md and, given an index, {destination}_viewer.html.
+
+    `report` is the whole report or its sections from iter_markdown_report,
+    which are written as they are generated.
+    """
+    OUTPUT_DIR.mkdir(exist_ok=True)
+
+    mindmap_file = OUTPUT_DIR / "mindmap.mmd"
+    mindmap_file.write_text(mindmap, encoding='utf-8')
+    print(f"[INFO] Mindmap saved to {mindmap_file}")
+
+    report_file = OUTPUT_DIR / f"{destination}_攻略.md"
+    with report_file.open('w', encoding='utf-8') as f:
+        for i, section in enumerate([report] if isinstance(report, str) else report):
+            f.write(("\n" if i else "") + section)
+    print(f"[INFO] Report saved to {report_file}")
+
+    viewer_file = None
+    if viewer is not None:
+        viewer_file = OUTPUT_DIR / f"{destination}_viewer.html"
+        write_viewer(viewer, viewer_file)
+        print(f"[INFO] Viewer saved to {viewer_file}")
+    return mindmap_file, report_file, viewer_file
 
 
 def main():
     parser = argparse.ArgumentParser(description="XHS Mindmap Visualizer")
     parser.add_argument("--input", type=str, default="analyzed.json", help="Input analyzed JSON")
     parser.add_argument("--destination", type=str, default="旅行", help="Destination name")
+    parser.add_argument("--top", type=int, default=10, help="Notes per category in the report (0: all)")
+    parser.add_argument("--no-viewer", action="store_true", help="Skip the HTML viewer")
     
     args = parser.parse_args()
     
@@ -129,24 +348,19 @@ def main():
         print(f"[ERROR] File not found: {input_path}")
         return
     
-    categorized = json.loads(input_path.read_text(encoding='utf-8'))
+    categorized = read_analyzed(input_path)
+    
+    ranker = Ranker.from_config()
     
     # Generate mindmap
-    mindmap = generate_mindmap(categorized, args.destination)
+    mindmap = generate_mindmap(categorized, args.destination, ranker)
     
-    # Generate full report
-    report = generate_markdown_report(categorized, args.destination, mindmap)
+    # Stream the report while saving, with the viewer index alongside
+    report = iter_markdown_report(categorized, args.destination, mindmap, ranker, args.top)
+    viewer = None if args.no_viewer else build_viewer_index(categorized, args.destination, ranker)
     
     # Save outputs
-    OUTPUT_DIR.mkdir(exist_ok=True)
-    
-    mindmap_file = OUTPUT_DIR / "mindmap.mmd"
-    mindmap_file.write_text(mindmap, encoding='utf-8')
-    print(f"[INFO] Mindmap saved to {mindmap_file}")
-    
-    report_file = OUTPUT_DIR / f"{args.destination}_攻略.md"
-    report_file.write_text(report, encoding='utf-8')
-    print(f"[INFO] Report saved to {report_file}")
+    save_outputs(mindmap, report, args.destination, viewer)
     
     # Print mindmap to console
     print("\n=== Generated Mindmap ===\n")
@@ -0,0 +1,71 @@
+import json
+import sys
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from capture import decode_search_payload, is_search_response, replay
+
+# Search API bodies recorded with scraper.py --capture-dir (tokens and IDs scrubbed)
+FIXTURES = Path(__file__).parent / "fixtures" / "capture"
+
+
+def load(name):
+    return json.loads((FIXTURES / name).read_text(encoding='utf-8'))
+
+
+class DecodeTest(unittest.TestCase):
+    def test_search_api_url(self):
+        self.assertTrue(is_search_response("https://edith.xiaohongshu.com/api/sns/web/v1/search/notes"))
+        self.assertFalse(is_search_response("https://edith.xiaohongshu.com/api/sns/web/v1/search/onebox"))
+
+    def test_decodes_note_cards(self):
+        notes = decode_search_payload(load("search_notes_1.json"), "黄山 攻略")
+        # The hot_query item is not a note
+        self.assertEqual([n['note_id'] for n in notes], ["65a1f0c2000000001a02b3c4", "65b20a11000000002c03d4e5"])
+
+        first, second = notes
+        self.assertEqual(first['title'], "黄山两天一夜攻略｜住山顶看日出")
+        self.assertEqual(first['author'], "山野旅行家")
+        self.assertEqual(first['link'], "https://www.xiaohongshu.com/explore/65a1f0c2000000001a02b3c4"
+                                        "?xsec_token=ABk3mZpQ1sV9&xsec_source=pc_search")
+        self.assertEqual((first['likes'], first['likes_count']), ("1.2万", 12000))
+        self.assertEqual((first['collects'], first['comments'], first['shares']), ("8431", "356", "97"))
+        self.assertEqual(first['time'], "2025-10-03")
+        self.assertEqual(first['query'], "黄山 攻略")
+
+        self.assertEqual(second['author'], "小鹿去旅行")
+        self.assertEqual(second['type'], "video")
+        self.assertEqual(second['link'], "https://www.xiaohongshu.com/explore/65b20a11000000002c03d4e5")
+        self.assertEqual(second['time'], 1706500800000)
+
+    def test_failed_or_empty_payload(self):
+        self.assertEqual(decode_search_payload({'success': False, 'data': load("search_notes_1.json")['data']}), [])
+        self.assertEqual(decode_search_payload({'success': True, 'data': {}}), [])
+        self.assertEqual(decode_search_payload(None), [])
+
+
+class ReplayTest(unittest.TestCase):
+    def replay(self, *paths):
+        with redirect_stdout(StringIO()):
+            return replay(paths, "黄山")
+
+    def test_replays_directory_deduplicated(self):
+        notes = self.replay(FIXTURES)
+        self.assertEqual([n['note_id'] for n in notes], [
+            "65a1f0c2000000001a02b3c4", "65b20a11000000002c03d4e5", "65c31b22000000003d04e5f6"
+        ])
+        self.assertTrue(all(n['query'] == "黄山" for n in notes))
+        # No publish time on the card, so none is invented
+        self.assertNotIn('time', notes[2])
+
+    def test_replays_files(self):
+        notes = self.replay(FIXTURES / "search_notes_2.json")
+        self.assertEqual([n['title'] for n in notes], ["学生党黄山穷游 人均500", "黄山索道排队避坑"])
+
+
+if __name__ == '__main__':
+    unittest.main()
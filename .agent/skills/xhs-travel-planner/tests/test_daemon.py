@@ -0,0 +1,85 @@
+import sys
+import json
+import asyncio
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from daemon import ScrapeDaemon
+
+
+class FakeTelemetry:
+    def write_metrics(self):
+        pass
+
+    def summary(self):
+        return {}
+
+
+class FakeScraper:
+    """Stands in for XHSScraper: the first search for a query hits a captcha."""
+
+    def __init__(self):
+        self.page = object()
+        self.telemetry = FakeTelemetry()
+        self.searched = set()
+
+    async def search(self, query, limit=30, page=None, on_note=None, blocked=None):
+        first = query not in self.searched
+        self.searched.add(query)
+        await asyncio.sleep(0.01)
+        if query == "exhausted":
+            return []
+        if first and query.startswith("captcha"):
+            blocked[query] = 'captcha'
+            return []
+        note = {'title': query, 'link': f"https://www.xiaohongshu.com/explore/{len(self.searched):024x}"}
+        if on_note:
+            on_note(note)
+        return [note]
+
+    async def _pace(self, kind):
+        pass
+
+    async def save_cookies(self):
+        pass
+
+
+class FakeWriter:
+    def __init__(self):
+        self.messages = []
+
+    def write(self, data: bytes):
+        self.messages.append(json.loads(data))
+
+    def is_closing(self):
+        return False
+
+
+class RunJobTest(unittest.TestCase):
+    def run_jobs(self, *queries):
+        async def main():
+            daemon = ScrapeDaemon(FakeScraper(), pages=2)
+            daemon.pool.put_nowait(object())
+            daemon.pool.put_nowait(object())
+            writers = [FakeWriter() for _ in queries]
+            await asyncio.gather(*(daemon.run_job({'op': 'search', 'query': q}, w)
+                                   for q, w in zip(queries, writers)))
+            return [w.messages[-1] for w in writers]
+        return asyncio.run(main())
+
+    def test_blocked_is_reported_per_job(self):
+        first, second = self.run_jobs("captcha 黄山", "captcha 黄山")
+        self.assertEqual(first['blocked'], ["captcha 黄山"])
+        self.assertEqual(second['blocked'], [])
+        self.assertEqual(second['notes'], 1)
+
+    def test_empty_query_is_not_blocked(self):
+        done, = self.run_jobs("exhausted")
+        self.assertEqual(done['blocked'], [])
+        self.assertEqual(done['notes'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import sys
+import asyncio
+import tempfile
+import unittest
+from importlib.util import find_spec
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from corpus import generate_notes, render_search_html
+
+# scraper.py exits without patchright, and extraction needs a local Chrome
+HAS_PATCHRIGHT = find_spec("patchright") is not None
+
+
+@unittest.skipUnless(HAS_PATCHRIGHT, "patchright is not installed")
+class FixtureExtractionTest(unittest.TestCase):
+    """scraper.py --fixture: card extraction against a saved search page."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.notes = generate_notes(40, seed=7)
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.html = Path(cls.tmp.name) / "search.html"
+        cls.html.write_text(render_search_html(cls.notes), encoding='utf-8')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def extract(self, mode):
+        from scraper import XHSScraper
+
+        async def run():
+            scraper = XHSScraper(extract_mode=mode)
+            try:
+                await scraper.start(headless=True)
+            except Exception as e:
+                if scraper.pw:
+                    await scraper.pw.stop()
+                self.skipTest(f"no browser: {e}")
+            try:
+                return await scraper.extract_fixture(self.html)
+            finally:
+                # Not scraper.close(): that would overwrite the saved login cookies
+                await scraper.browser.close()
+                await scraper.pw.stop()
+
+        return asyncio.run(run())
+
+    def expected(self):
+        return [{k: n[k] for k in ('title', 'author', 'link', 'likes')} for n in self.notes]
+
+    def test_batch_extraction(self):
+        self.assertEqual(self.extract('batch'), self.expected())
+
+    def test_element_extraction_matches_batch(self):
+        self.assertEqual(self.extract('element'), self.expected())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import corpus
+import matcher
+from analyzer import categorize_note, load_keywords
+from matcher import KeywordMatcher
+
+EDGE_CASES = {
+    "交通": ["交通", "交通攻略", "高铁", "自驾"],
+    "攻略": ["攻略", "路线", "行程规划", "规划"],
+    "路线": ["路线"],
+    "英文": ["Vlog", "citywalk", "CityWalk"],
+    "全部": [""],
+}
+
+
+def old_categorize(title: str, categories: dict) -> list:
+    """The substring loop categorize_note used before the matcher."""
+    matched = []
+    title_lower = title.lower()
+    for category, keywords in categories.items():
+        for keyword in keywords:
+            if keyword in title_lower or keyword in title:
+                matched.append(category)
+                break
+    return matched if matched else ["其他"]
+
+
+def old_hits(title: str, categories: dict) -> dict:
+    return {category: {k for k in keywords if k in title.lower() or k in title}
+            for category, keywords in categories.items()
+            if any(k in title.lower() or k in title for k in keywords)}
+
+
+class KeywordMatcherTest(unittest.TestCase):
+    titles = [n['title'] for n in corpus.generate_notes(5000)] + ["", "CITYWALK 交通攻略行程规划"]
+
+    def check(self, categories):
+        keyword_matcher = KeywordMatcher(categories)
+        for title in self.titles:
+            self.assertEqual(keyword_matcher.categorize(title), old_categorize(title, categories), title)
+            hits = keyword_matcher.match(title)
+            self.assertEqual({cat: set(words) for cat, words in hits.items()}, old_hits(title, categories), title)
+            self.assertEqual(list(hits), [cat for cat in categories if cat in hits])
+
+    def test_shipped_keywords(self):
+        self.check(load_keywords())
+
+    def test_overlapping_shared_cased_and_empty_keywords(self):
+        self.check(EDGE_CASES)
+
+    def test_automaton_for_large_keyword_sets(self):
+        with mock.patch.object(matcher, 'REGEX_MAX_KEYWORDS', 0):
+            self.check(load_keywords())
+            self.check(EDGE_CASES)
+
+    def test_categorize_note_without_matcher(self):
+        categories = {cat: list(words) for cat, words in load_keywords().items()}
+        for title in self.titles[:500]:
+            self.assertEqual(categorize_note(title, categories), old_categorize(title, categories))
+        categories["新"] = ["攻略"]
+        self.assertIn("新", categorize_note("黄山攻略", categories))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import random
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import pacing
+from pacing import CAPTCHA, EMPTY, OK, PACERS, AdaptivePacer, SimulatedServer, simulate
+
+
+def run(name, tolerance, seed, pages=200):
+    return simulate(PACERS[name](rng=random.Random(seed)),
+                    SimulatedServer(tolerance, rng=random.Random(seed + 1000)), pages)
+
+
+class AdaptivePacerTest(unittest.TestCase):
+    def setUp(self):
+        self.pacer = AdaptivePacer(rng=random.Random(0))
+
+    def test_speeds_up_while_healthy(self):
+        level = self.pacer.level
+        for _ in range(10):
+            self.pacer.record(OK, 5)
+        self.assertLess(self.pacer.level, level)
+        self.assertGreaterEqual(self.pacer.level, self.pacer.floor)
+
+    def test_captcha_backs_off_and_rests(self):
+        level = self.pacer.level
+        self.pacer.record(CAPTCHA)
+        self.assertEqual(self.pacer.level, level * self.pacer.backoff ** 2)
+        self.assertEqual(self.pacer.take_rest(), self.pacer.rest_seconds)
+        # A scheduled rest is taken once
+        self.assertEqual(self.pacer.take_rest(), 0.0)
+
+    def test_only_first_strike_sets_limit(self):
+        level = self.pacer.level
+        for _ in range(3):
+            self.pacer.record(EMPTY)
+        self.assertEqual(self.pacer.limit, level * pacing.MARGIN)
+
+
+class SimulateTest(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(run('adaptive', 12, seed=3), run('adaptive', 12, seed=3))
+
+    def test_adaptive_beats_fixed_within_tolerance(self):
+        for tolerance in (12, 20):
+            adaptive = [run('adaptive', tolerance, seed) for seed in range(3)]
+            fixed = [run('fixed', tolerance, seed) for seed in range(3)]
+
+            def rate(runs):
+                return sum(r['useful_pages'] for r in runs) / sum(r['minutes'] for r in runs)
+
+            self.assertGreater(rate(adaptive), rate(fixed), tolerance)
+
+    def test_adaptive_recovers_from_captchas(self):
+        # A strict server: the pacer may hit captchas but must not keep hitting them
+        result = run('adaptive', 8, seed=0, pages=400)
+        self.assertLess(result['captchas'], 10)
+        self.assertGreater(result['useful_pages'], 350)
+
+    def test_simulate_cli(self):
+        argv = ["pacing.py", "--simulate", "--pages", "50", "--seeds", "2", "--tolerance", "12"]
+        out = StringIO()
+        with mock.patch.object(sys, 'argv', argv), redirect_stdout(out):
+            pacing.main()
+        rows = [line.split() for line in out.getvalue().splitlines()[2:]]
+        self.assertEqual([row[1] for row in rows], list(PACERS))
+        self.assertTrue(all(float(row[2]) > 0 for row in rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
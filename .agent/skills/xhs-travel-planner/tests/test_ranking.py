@@ -0,0 +1,43 @@
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import capture
+from ranking import NEUTRAL_RECENCY, Ranker
+
+NOW = datetime(2026, 3, 10, 12, 0)
+
+
+class RecencyTest(unittest.TestCase):
+    def setUp(self):
+        self.ranker = Ranker(now=NOW)
+
+    def test_scrape_time_is_not_recency(self):
+        note = {'title': 't', 'likes': '10', 'scraped_at': '2026-03-10T11:00:00', 'last_seen': '2026-03-10'}
+        self.assertEqual(self.ranker.features(note)['recency'], NEUTRAL_RECENCY)
+
+    def test_newer_publish_time_ranks_higher(self):
+        old = {'title': 'old', 'likes': '10', 'time': '2025-12-01'}
+        new = {'title': 'new', 'likes': '10', 'time': int(datetime(2026, 3, 9).timestamp() * 1000)}
+        self.assertEqual(self.ranker.top_k([old, new], 1), [new])
+        self.assertGreater(self.ranker.features(new)['recency'], NEUTRAL_RECENCY)
+        self.assertLess(self.ranker.features(old)['recency'], NEUTRAL_RECENCY)
+
+    def test_card_publish_times(self):
+        def tag(text):
+            return capture.publish_time({'corner_tag_info': [{'type': 'publish_time', 'text': text}]}, NOW)
+
+        self.assertEqual(tag("3天前"), "2026-03-07T12:00")
+        self.assertEqual(tag("昨天 18:20"), "2026-03-09")
+        self.assertEqual(tag("2024-05-01"), "2024-05-01")
+        self.assertEqual(tag("03-01"), "2026-03-01")
+        self.assertEqual(tag("05-01"), "2025-05-01")
+        self.assertIsNone(tag("编辑于"))
+        self.assertEqual(capture.publish_time({'time': 1700000000000}), 1700000000000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import corpus
+from store import NoteStore
+
+
+class NoteStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = NoteStore(Path(self.tmp.name) / "notes.db")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_search_matches_substring_scan(self):
+        self.store.add_many(corpus.generate_notes(2000))
+        for match in ["黄山 酒店", "黄山攻略", "州 学生党", "山", "vlog", "｜"]:
+            terms = match.split()
+            expected = self.store.conn.execute(
+                "SELECT COUNT(*) FROM notes WHERE " + " AND ".join("title LIKE ?" for _ in terms),
+                [f"%{term}%" for term in terms]).fetchone()[0]
+            self.assertEqual(len(list(self.store.search(match))), expected, match)
+
+    def test_retitled_note_is_reindexed(self):
+        self.store.add({'note_id': 'a1', 'title': '黄山日出'})
+        self.store.add({'note_id': 'a1', 'title': '西湖夜游'})
+        self.assertEqual(list(self.store.search("黄山")), [])
+        self.assertEqual(len(list(self.store.search("西湖"))), 1)
+
+    def test_unchanged_numeric_engagement_is_logged_once(self):
+        for _ in range(3):
+            self.store.add({'note_id': 'a1', 'title': 't', 'likes': 120})
+        self.store.add({'note_id': 'a1', 'title': 't', 'likes': 121})
+        self.assertEqual([row['likes'] for row in self.store.history('a1')], ['120', '121'])
+
+    def test_existing_store_gets_short_term_index(self):
+        path = Path(self.tmp.name) / "old.db"
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE notes (id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, title TEXT NOT NULL,
+                author TEXT, link TEXT, query TEXT, likes TEXT, data TEXT NOT NULL,
+                first_seen TEXT NOT NULL, last_seen TEXT NOT NULL);
+            INSERT INTO notes (key, title, data, first_seen, last_seen) VALUES ('k', '黄山酒店', '{}', 'a', 'a');
+        """)
+        conn.close()
+        store = NoteStore(path)
+        try:
+            self.assertEqual(len(list(store.search("酒店"))), 1)
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()